@@ -1,12 +1,19 @@
+from ..utils.customer_engine import EngineField, status_from_value
 from ..utils.order_status import OrderStatus, food_options
 import mesa
-import random
 
 class CustomerAgent(mesa.Agent):
-    def __init__(self, model):
+    # Backing values for waiting_time/satisfaction; the model's running totals
+    # start from these when the customer is registered
+    _waiting_time = 0
+    _satisfaction = 100
+
+    def __init__(self, model, food_preference=None, dining_duration=None):
         super().__init__(model)
-        # Initialize customer properties
-        self.food_preference = random.choice(list(food_options.keys()))
+        # Initialize customer properties; preference and duration may come from a pre-drawn ArrivalSchedule
+        if food_preference is None:
+            food_preference = self.random.choice(list(food_options.keys()))
+        self.food_preference = food_preference
         self.bill = food_options[self.food_preference]["price"]    # Amount to pay for food
         self.waiting_time = 0                         # Time spent waiting
         self.order_status = OrderStatus.ORDERED       # Current order status
@@ -14,8 +21,31 @@ class CustomerAgent(mesa.Agent):
         self.satisfaction = 100                       # Overall satisfaction (0-100)
         self.tip = 0                                  # Amount of tip given
         self.assigned_waiter = []                     # Reference to assigned waiter
-        self.dining_duration = random.randint(60, 120)  # Time to spend at restaurant
+        if dining_duration is None:
+            dining_duration = self.random.randint(60, 120)
+        self.dining_duration = dining_duration  # Time to spend at restaurant
         self._served_logged = False
+        model.add_waiting_customer(self)
+
+    @property
+    def waiting_time(self):
+        return self._waiting_time
+
+    @waiting_time.setter
+    def waiting_time(self, value):
+        if self.model.has_customer(self):
+            self.model.total_waiting_time += value - self._waiting_time
+        self._waiting_time = value
+
+    @property
+    def satisfaction(self):
+        return self._satisfaction
+
+    @satisfaction.setter
+    def satisfaction(self, value):
+        if self.model.has_customer(self):
+            self.model.total_satisfaction += value - self._satisfaction
+        self._satisfaction = value
 
     def step(self):
         """Update customer state each time step (5 minutes)"""
@@ -72,15 +102,12 @@ class CustomerAgent(mesa.Agent):
 
     def leave_without_paying(self):
         """Leave restaurant due to excessive waiting time"""
-        # Find waiters in the model's agent list
-        waiters = self.model.agents.select(lambda x: hasattr(x, 'carrying_food'))
-
         # Notify waiters carrying food for this customer
-        for waiter in waiters:
+        for waiter in self.model.waiters_carrying(self):
             for i, (customer, food_type) in enumerate(waiter.carrying_food):
                 if customer == self:
                     # Mark food as available for reassignment
-                    waiter.carrying_food[i] = (None, food_type)
+                    waiter.set_carried(i, None, food_type)
                     # print(
                      #   f"Waiter {waiter.unique_id} notified: Customer {self.unique_id} left, will reassign their {food_type}")
 
@@ -97,12 +124,10 @@ class CustomerAgent(mesa.Agent):
         # print(f"Customer paid ${payment:.2f} at minute {self.model.current_minute}. Wait time: {self.waiting_time}")
 
         # Clean up references in waiters' carrying lists
-        waiters = self.model.agents.select(lambda x: hasattr(x, 'carrying_food'))
-
-        for waiter in waiters:
+        for waiter in self.model.waiters_carrying(self):
             for i, (customer, food_type) in enumerate(waiter.carrying_food):
                 if customer == self:
-                    waiter.carrying_food[i] = (None, food_type)
+                    waiter.set_carried(i, None, food_type)
 
         # Remove reference to undefined self.waiter
         if self.assigned_waiter:
@@ -110,3 +135,25 @@ class CustomerAgent(mesa.Agent):
                 waiter.update_performance_metrics(self)
 
         self.model.remove_customer(self)
+
+
+class ArrayCustomerAgent(CustomerAgent):
+    """
+    Customer whose state lives in the model's CustomerEngine.
+
+    The agent is a thin view on its engine row, so waiters, the kitchen and the
+    reporters use it like any other customer; the per-step update happens for all
+    customers at once in CustomerEngine.step.
+    """
+    _engine = None
+    _row = None
+
+    order_minute = EngineField("order_minute")
+    dining_duration = EngineField("dining_duration")
+    order_status = EngineField("status", to_python=status_from_value)
+    waiting_time = EngineField("waiting_time", total="total_waiting_time")
+    satisfaction = EngineField("satisfaction", total="total_satisfaction")
+    bill = EngineField("bill")
+
+    def step(self):
+        """Customers are updated in bulk by the model's CustomerEngine"""
@@ -3,6 +3,7 @@ from ..agents.customer_agent import CustomerAgent
 from ..agents.waiter_agent import WaiterAgent
 from ..utils.schedule_optimizer import ScheduleOptimizer
 from ..utils.waiter_definfitions import WaiterDefinition
+from ..utils.event_log import INFO
 
 
 import mesa
@@ -12,7 +13,7 @@ class ManagerAgent(mesa.Agent):
     def __init__(self, model):
         super().__init__(model)
         # Initialize schedule optimizer# Initialize optimizer
-        self.schedule_optimizer = ScheduleOptimizer()
+        self.schedule_optimizer = ScheduleOptimizer(events=model.events)
 
         # Essential properties from WaiterDefinition
         self.shifts = WaiterDefinition.SHIFTS
@@ -107,7 +108,9 @@ class ManagerAgent(mesa.Agent):
             shift: len(waiters) for shift, waiters in self.schedule.items()
         }
 
-        # Print the schedule information
-        print(f"Optimized schedule for day {self.model.current_day}:")
-        for shift, waiters in self.schedule.items():
-            print(f"Shift {shift}: {', '.join(waiters)} ({len(waiters)} waiters)")
+        # Log the schedule information
+        events = self.model.events
+        if events.enabled("schedule", INFO):
+            events.info("schedule", "Optimized schedule for day %d:\n%s", self.model.current_day,
+                        "\n".join(f"Shift {shift}: {', '.join(waiters)} ({len(waiters)} waiters)"
+                                  for shift, waiters in self.schedule.items()))
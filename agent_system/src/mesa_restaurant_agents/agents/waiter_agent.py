@@ -1,6 +1,8 @@
-from ..utils.order_status import OrderStatus
+from ..utils.order_status import OrderStatus, WaiterState
 from ..agents.customer_agent import CustomerAgent
 from ..utils.order_status import food_options
+from ..utils.event_log import DEBUG
+from ..utils.route_planner import plan_route
 
 import mesa
 
@@ -16,6 +18,10 @@ class WaiterAgent(mesa.Agent):
         self.target_pos = None  # Target position to move towards
         self.previous_pos = None  # Previous position to avoid oscillation
         self.is_available = True
+        self.route = []  # Carried customers in planned delivery order
+        self.state = WaiterState.IDLE_AT_KITCHEN
+        self._skip_move = False
+        self._planning = False
 
     def __str__(self):
         if hasattr(self, 'display_name'):
@@ -23,40 +29,69 @@ class WaiterAgent(mesa.Agent):
         else:
             return f"Waiter {self.unique_id}"
 
+    @property
+    def carrying_food(self):
+        """List of (customer, order) items being carried; customer is None for food to reassign"""
+        return self._carrying_food
+
+    @carrying_food.setter
+    def carrying_food(self, food):
+        # Keep the model's customer -> carrying waiters index in sync with the new list
+        for customer, _ in getattr(self, '_carrying_food', ()):
+            self.model.untrack_carried(customer, self)
+        self._carrying_food = list(food)
+        for customer, _ in self._carrying_food:
+            self.model.track_carried(customer, self)
+
+    def carry(self, customer, order):
+        """Add an item to the carried food"""
+        self._carrying_food.append((customer, order))
+        self.model.track_carried(customer, self)
+
+    def set_carried(self, i, customer, order):
+        """Replace the item in slot i, e.g. (None, order) to mark it for reassignment"""
+        self.model.untrack_carried(self._carrying_food[i][0], self)
+        self._carrying_food[i] = (customer, order)
+        self.model.track_carried(customer, self)
+
+    def drop_carried(self, i):
+        """Remove the item in slot i and return it"""
+        customer, order = self._carrying_food.pop(i)
+        self.model.untrack_carried(customer, self)
+        return customer, order
+
     def can_pick_up_food(self, customer=None, order=None):
         """Check if the waiter can pick up more food and if the order is valid"""
         return len(self.carrying_food) < self.max_carry
 
     def move(self, steps=8):
-        """Move towards the target position using A* pathfinding"""
+        """Move towards the target position along a shortest walkway path"""
         if not self.target_pos or self.pos == self.target_pos:
             return
 
         initial_pos = self.pos
         moves_made = 0
+        grid = self.model.grid
+        pos = self.pos
 
         while moves_made < steps:
-            if self.pos == self.target_pos:
-                break
-
-            valid_moves = self.get_valid_moves_toward_target(self.target_pos)
-            if not valid_moves:
+            # None once we are at the target, or next to it if it is a table
+            new_pos = grid.next_hop(pos, self.target_pos)
+            if new_pos is None:
                 break
 
             # Store current position before moving
-            self.previous_pos = self.pos
-            # Take the first move (closest to target)
-            new_pos = valid_moves[0]
-
-            self.model.grid.move_agent(self, new_pos)
+            self.previous_pos = pos
+            pos = new_pos
             moves_made += 1
 
-            # Stop if we reached target
-            if new_pos == self.target_pos:
-                break
+        # Nothing is in the way on the walkways, so only the final cell is committed to the grid
+        if moves_made:
+            grid.move_agent(self, pos)
 
         if moves_made > 0:
-            print(f"Waiter {self.unique_id} moved from {initial_pos} to {self.pos}, steps: {moves_made}")
+            self.model.events.debug("waiter", "Waiter %s moved from %s to %s, steps: %d",
+                                    self.unique_id, initial_pos, self.pos, moves_made)
             return True
 
         return False
@@ -64,95 +99,151 @@ class WaiterAgent(mesa.Agent):
     def get_kitchen_pos(self):
         return self.model.grid.layout['kitchen']
 
-    def get_valid_moves_toward_target(self, target_pos):
-        """Get valid moves sorted by distance to target position"""
-        # Get possible moves
-        possible_moves = self.model.grid.get_neighborhood(
-            self.pos, moore=True, include_center=False
-        )
-
-        # Filter valid moves (only walkways or kitchen)
-        valid_moves = []
-        for pos in possible_moves:
-            is_walkable = (pos in self.model.grid.layout['walkways'] or
-                           pos == self.model.grid.layout['kitchen'])
-
-            # Sort by distance to target if we have valid moves
-            if is_walkable and pos != self.previous_pos:
-                valid_moves.append(pos)
-
-        # Sort by Manhattan distance to target
-        if valid_moves and target_pos:
-            return sorted(valid_moves, key=lambda p: self.manhattan_distance(p, target_pos))
-
-        return valid_moves
-
     def manhattan_distance(self, pos1, pos2):
         """Calculate Manhattan distance between two positions"""
         if pos1 and pos2:
             return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
         return 1000 # Arbitrary large distance if positions are invalid
 
-    def step(self):
-        """Main step function for the waiter agent"""
-        # Carrying food - focus on delivery
-        if len(self.carrying_food) > 0:
-            # Already carrying food - prioritize delivery
-            if self.target_pos is None:
-                # Find the customer we're carrying food for
-                for customer, order in self.carrying_food:
-                    if customer is not None:
-                        customer_pos = getattr(customer, 'pos', None)
-                        if customer_pos:
-                            self.target_pos = customer_pos
-                            break
-
-                # Second priority: find customer for reassignable food
-                if self.target_pos is None:
-                    target_customer = self.find_best_customer_for_existing_food()
-                    if target_customer:
-                        self.target_pos = target_customer.pos
-                        print(
-                            f"Waiter {self.unique_id} targeting customer {target_customer.unique_id} for reassignment")
-
-            # Debug current state - moved here after target calculation
-            print(f"DEBUG: Waiter {self.unique_id} step - available={self.is_available}, "
-                  f"carrying_food={len(self.carrying_food)}, target_pos={self.target_pos}")
-
-            # If we have a target, move toward it
-            if self.target_pos:
-                self.move()
-
-                # Check if we're near the target to serve food
-                cell_contents = self.model.grid.get_cell_list_contents([self.target_pos])
-                customers = [obj for obj in cell_contents if isinstance(obj, CustomerAgent)]
-
-                if customers and self.pos in self.model.grid.get_neighborhood(
-                        self.target_pos, moore=True, include_center=False):
-                    # Try to serve food
-                    served = self.serve_dish(customers[0])
-
-                    # Only reset target if we've served all food or need a new target
-                    if served and not self.carrying_food:
-                        self.target_pos = None  # Go back to kitchen
-                    elif served:
-                        # We served but still have food - find next target immediately
-                        self.target_pos = None
-                        self.step()  # Recursively find next target
-                        return
+    def next_delivery(self):
+        """Next customer on the planned delivery route, re-planning when the carried customers change"""
+        carried = list(dict.fromkeys(customer for customer, _ in self.carrying_food
+                                     if customer is not None and getattr(customer, 'pos', None)))
+        if not carried:
+            self.route = []
+            return None
 
+        carried_set = set(carried)
+        if carried_set <= set(self.route):
+            # Only stops were dropped (e.g. served): the rest of an optimal route stays optimal
+            self.route = [customer for customer in self.route if customer in carried_set]
         else:
-            # No food - handle kitchen operations
-            if self.pos == self.get_kitchen_pos():
-                self.pick_up_prepared_orders()
-                # If we got food, find a target immediately
-                if self.carrying_food:
-                    self.target_pos = None
-                    self.step()  # Recursively find next target
-            else:
-                # Not at kitchen and not carrying food - go to kitchen
-                self.target_pos = self.get_kitchen_pos()
-                self.move()
+            grid = self.model.grid
+            order = plan_route(grid.paths, self.pos, [customer.pos for customer in carried],
+                               end=self.get_kitchen_pos())
+            self.route = [carried[i] for i in order]
+            self.model.events.debug("waiter", "Waiter %s planned route %s", self.unique_id,
+                                    [customer.unique_id for customer in self.route])
+        return self.route[0]
+
+    def step(self, moved=False):
+        """Run the waiter's state machine for one model step
+
+        Every state does a bounded amount of work and either ends the step or hands over to the
+        next state. Handing over only continues after picking up food or serving an item, and each
+        item takes at most four states (delivering, reassigning, delivering, serving), so a step
+        runs at most 4 * max_carry + 2 states. With moved=True the first move of this step was
+        already made by the model's batched movement phase (see prepare_move).
+        """
+        self._skip_move = moved
+        self._run_states()
+
+    def prepare_move(self):
+        """Choose the target of this step's move without moving, for the batched movement phase
+
+        Runs the same states as step() up to the first walk, which is left to the batched phase.
+        """
+        self._planning = True
+        self._run_states()
+        self._planning = False
+
+    def _run_states(self):
+        self.state = self._resume_state()
+        for _ in range(4 * max(self.max_carry, len(self.carrying_food)) + 2):
+            next_state = self._HANDLERS[self.state](self)
+            if next_state is None:
+                break
+            self.state = next_state
+
+    def _resume_state(self):
+        """State to continue in, derived from what the waiter carries (the model may reset it)"""
+        if self.carrying_food:
+            return WaiterState.DELIVERING
+        if self.pos == self.get_kitchen_pos():
+            return WaiterState.IDLE_AT_KITCHEN
+        return WaiterState.TO_KITCHEN
+
+    def _walk(self):
+        """Move toward the target, unless the batched movement phase already did for this leg
+        or the model's event engine schedules the walk; False while planning, which ends there"""
+        if self._planning:
+            return False
+        if self._skip_move:
+            self._skip_move = False
+        elif self.model.event_engine is None:
+            self.move()
+        return True
+
+    def _idle_at_kitchen(self):
+        """Pick up prepared orders; with food in hand, start delivering right away"""
+        if self._planning:
+            # Food is picked up in step(), after the batched moves
+            return None
+        self.pick_up_prepared_orders()
+        self._skip_move = False
+        if self.carrying_food:
+            self.target_pos = None
+            return WaiterState.DELIVERING
+        return None
+
+    def _to_kitchen(self):
+        """Walk back to the kitchen; orders are picked up on the next step"""
+        self.target_pos = self.get_kitchen_pos()
+        self._walk()
+        return None
+
+    def _delivering(self):
+        """Walk toward the next customer on the route"""
+        if self.target_pos is None:
+            customer = self.next_delivery()
+            if customer is None:
+                return WaiterState.REASSIGNING
+            self.target_pos = customer.pos
+
+        # Debug current state - moved here after target calculation
+        self.model.events.debug("waiter", "Waiter %s step - available=%s, carrying_food=%d, target_pos=%s",
+                                self.unique_id, self.is_available, len(self.carrying_food), self.target_pos)
+
+        if not self._walk():
+            return None
+        # Check if we're near the target to serve food
+        if self.model.grid.can_serve_from(self.pos, self.target_pos):
+            return WaiterState.SERVING
+        return None
+
+    def _serving(self):
+        """Serve the customer at the target table"""
+        self._skip_move = False
+        customers = [obj for obj in self.model.grid.get_cell_list_contents([self.target_pos])
+                     if isinstance(obj, CustomerAgent)]
+        if not customers or not self.serve_dish(customers[0]):
+            # Nobody to serve (yet); stay at the table
+            return None
+
+        self.target_pos = None
+        if not self.carrying_food:
+            # Served all food - go back to kitchen on the next step
+            return None
+        # We served but still have food - go on to the next target immediately
+        return WaiterState.DELIVERING
+
+    def _reassigning(self):
+        """Look for a customer for food whose customer left; undeliverable food is discarded"""
+        target_customer = self.find_best_customer_for_existing_food()
+        if target_customer:
+            self.target_pos = target_customer.pos
+            self.model.events.debug("waiter", "Waiter %s targeting customer %s for reassignment",
+                                    self.unique_id, target_customer.unique_id)
+            return WaiterState.DELIVERING
+        return None
+
+    _HANDLERS = {
+        WaiterState.IDLE_AT_KITCHEN: _idle_at_kitchen,
+        WaiterState.TO_KITCHEN: _to_kitchen,
+        WaiterState.DELIVERING: _delivering,
+        WaiterState.SERVING: _serving,
+        WaiterState.REASSIGNING: _reassigning,
+    }
 
     def find_best_customer_for_existing_food(self):
         """Find the best customer to serve with food we're already carrying"""
@@ -160,73 +251,85 @@ class WaiterAgent(mesa.Agent):
         for i, (customer, order) in enumerate(self.carrying_food):
             if customer is not None:
                 # Check if customer is still in the model and still waiting for food
-                customer_exists = customer in self.model.agents.select(agent_type=CustomerAgent)
+                customer_exists = self.model.has_customer(customer)
 
                 # If customer is not in the model or has changed status, mark food as reassignable
                 if not customer_exists or customer.order_status not in [OrderStatus.ORDERED, OrderStatus.DELIVERING]:
-                    print(
-                        f"DEBUG: Waiter {self.unique_id} marking {order} as reassignable - customer "
-                        f"{customer.unique_id if hasattr(customer, 'unique_id') else 'None'} no longer valid")
-                    self.carrying_food[i] = (None, order)  # Mark as reassignable
+                    self.model.events.debug("waiter", "Waiter %s marking %s as reassignable - customer %s no longer valid",
+                                            self.unique_id, order, getattr(customer, 'unique_id', None))
+                    self.set_carried(i, None, order)  # Mark as reassignable
 
         # Count reassignable food
         reassignable_food = [(i, order) for i, (cust, order) in enumerate(self.carrying_food) if cust is None]
-        print(
-            f"DEBUG: Waiter {self.unique_id} has {len(reassignable_food)} "
-            f"reassignable food items: {[f[1] for f in reassignable_food]}")
+        events = self.model.events
+        if events.enabled("waiter", DEBUG):
+            events.debug("waiter", "Waiter %s has %d reassignable food items: %s",
+                         self.unique_id, len(reassignable_food), [f[1] for f in reassignable_food])
 
         # If food not reassignable after checking, discard stuck food items
         if len(reassignable_food) == 0 and len(self.carrying_food) > 0:
-            print(
-                f"DEBUG: Waiter {self.unique_id} discarding undeliverable food: {[order for _, order in self.carrying_food]}")
+            if events.enabled("waiter", DEBUG):
+                events.debug("waiter", "Waiter %s discarding undeliverable food: %s",
+                             self.unique_id, [order for _, order in self.carrying_food])
             self.carrying_food = []
             self.target_pos = None
             return None
 
-        # If we have reassignable food, find a customer to serve
-        ready_customers = [c for c in self.model.agents.select(agent_type=CustomerAgent)
-                           if c.order_status in [OrderStatus.ORDERED, OrderStatus.DELIVERING]
-                           and not c.assigned_waiter]
-
-        print(f"DEBUG: Found {len(ready_customers)} potential customers for reassignment")
-
-        if not ready_customers:
+        # With a central dispatcher, leftover food is matched to customers there
+        if self.model.dispatcher is not None:
             return None
 
-        customer_scores = []
-
-        for customer in ready_customers:
-            # Check if customer's preference matches any reassignable food
-            for i, order in reassignable_food:
-                if order == customer.food_preference:
-                    waiting_score = customer.waiting_time / 3
-                    distance = self.manhattan_distance(self.pos, customer.pos) # Calculate distance to customer
+        # If we have reassignable food, find a customer to serve
+        if events.enabled("waiter", DEBUG):
+            events.debug("waiter", "Found %d potential customers for reassignment",
+                         self.model.count_waiting_customers())
 
-                    # Balance distance penalty - cap it at 30% of waiting score to avoid
-                    # distant customers being perpetually ignored
-                    distance_penalty = min(distance / 50, waiting_score * 0.3)
+        if not self.model.count_waiting_customers():
+            return None
 
-                    # High base score prevent negative scores and stabilize selection
-                    score = 100 + waiting_score - distance_penalty
-                    # Add customer to the list with their score
-                    customer_scores.append((customer, score, i, order))
+        # First reassignable slot for every kind of food we carry
+        slots = {}
+        for i, order in reassignable_food:
+            slots.setdefault(order, i)
+
+        best = None  # (score, customer, slot, order)
+        now = self.model.current_minute
+        for order, i in slots.items():
+            # Unassigned waiting customers who want this food, longest waiting first
+            for customer in self.model.waiting_customers(order):
+                # No later customer can beat the best score: a score is at most 100 + waiting score
+                if best is not None and 100 + (now - customer.order_minute) / 3 <= best[0]:
                     break
-
-        # Sort customers by score
-        if customer_scores:
-            customer_scores.sort(key=lambda x: x[1], reverse=True)
-            # Select the best customer based on the highest score from the sorted customer scores
-            best_customer, _, i, matched_order = customer_scores[0]
-            best_customer.assigned_waiter = [self]
+                if customer.order_status not in [OrderStatus.ORDERED, OrderStatus.DELIVERING]:
+                    continue
+                waiting_score = customer.waiting_time / 3
+                distance = self.manhattan_distance(self.pos, customer.pos) # Calculate distance to customer
+
+                # Balance distance penalty - cap it at 30% of waiting score to avoid
+                # distant customers being perpetually ignored
+                distance_penalty = min(distance / 50, waiting_score * 0.3)
+
+                # High base score prevent negative scores and stabilize selection
+                score = 100 + waiting_score - distance_penalty
+                # On equal scores the customer who arrived first wins
+                if best is None or score > best[0] or (score == best[0] and
+                                                       customer.unique_id < best[1].unique_id):
+                    best = (score, customer, i, order)
+
+        if best is not None:
+            # Select the best customer based on the highest score
+            _, best_customer, i, matched_order = best
+            self.model.assign_waiter(best_customer, self)
 
             # Update the carrying_food list with new customer
-            self.carrying_food[i] = (best_customer, matched_order)
+            self.set_carried(i, best_customer, matched_order)
 
-            print(f"DEBUG: Waiter {self.unique_id} found customer {best_customer.unique_id} for {matched_order}")
+            events.debug("waiter", "Waiter %s found customer %s for %s",
+                         self.unique_id, best_customer.unique_id, matched_order)
             return best_customer
 
         # No matches found - food is likely undeliverable
-        print(f"DEBUG: Waiter {self.unique_id} couldn't find matching customers for reassignable food")
+        events.debug("waiter", "Waiter %s couldn't find matching customers for reassignable food", self.unique_id)
         return None
 
     def pick_up_prepared_orders(self):
@@ -234,28 +337,21 @@ class WaiterAgent(mesa.Agent):
         orders_picked = 0
         available_slots = self.max_carry - len(self.carrying_food)
 
-        if available_slots <= 0:
+        if available_slots <= 0 or self.model.dispatcher is not None:
             return 0
 
-        # Sort orders by customer waiting time (prioritize longest waiting customers)
-        prioritized_orders = sorted(
-            self.model.kitchen.prepared_orders.items(),
-            key=lambda item: item[0].waiting_time if hasattr(item[0], 'waiting_time') else 0,
-            reverse=True
-        )
-
-        # Pick up orders for customers who are waiting and not already assigned a waiter
-        for customer, order in prioritized_orders[:available_slots]:
+        # Take the orders of the longest waiting customers off the kitchen's pickup queue
+        for customer, order in self.model.kitchen.prepared_orders.take(available_slots):
             if self.can_pick_up_food(customer, order):
                 # Update customer status to DELIVERING when food is picked up
                 if customer.order_status == OrderStatus.ORDERED:
                     customer.order_status = OrderStatus.DELIVERING
-                    customer.assigned_waiter = [self]
+                    self.model.assign_waiter(customer, self)
 
-                self.carrying_food.append((customer, order))
-                del self.model.kitchen.prepared_orders[customer]
+                self.carry(customer, order)
                 orders_picked += 1
-                print(f"DEBUG: Waiter {self.unique_id} picked up {order} for customer {customer.unique_id}")
+                self.model.events.debug("waiter", "Waiter %s picked up %s for customer %s",
+                                        self.unique_id, order, customer.unique_id)
 
         return orders_picked
 
@@ -264,6 +360,7 @@ class WaiterAgent(mesa.Agent):
         if customer:
             customer.order_status = OrderStatus.SERVED
             customer.assigned_waiter.append(self)
+            self.model.customer_served(customer)
             self.served_customers += 1
             self.model.total_orders_served += 1
 
@@ -271,7 +368,8 @@ class WaiterAgent(mesa.Agent):
         """Serve food to customer, including reassigned """
         # First check if customer is in the right state to receive food
         if target_customer.order_status not in [OrderStatus.ORDERED, OrderStatus.DELIVERING]:
-            print(f"Cannot serve to customer {target_customer.unique_id} with status {target_customer.order_status}")
+            self.model.events.debug("waiter", "Cannot serve to customer %s with status %s",
+                                    target_customer.unique_id, target_customer.order_status)
             return False
 
         # Try to serve food originally for this customer
@@ -281,17 +379,16 @@ class WaiterAgent(mesa.Agent):
                 if customer is not None and customer.order_status in [OrderStatus.ORDERED, OrderStatus.DELIVERING]:
                     self._mark_customer_served(customer)
 
-                    # Get price info for debug output
-                    price = food_options.get(order, {}).get("price", 0)
-                    print(f"DEBUG: Waiter {self.unique_id} served customer {customer.unique_id} - "
-                          f"Order: {order}, Price: ${price:.2f}")
+                    self.model.events.debug("waiter", "Waiter %s served customer %s - Order: %s, Price: $%.2f",
+                                            self.unique_id, customer.unique_id, order,
+                                            food_options.get(order, {}).get("price", 0))
 
-                    self.carrying_food.pop(i)  # Remove customer and order from carrying list
+                    self.drop_carried(i)  # Remove customer and order from carrying list
                     return True
 
                 # Food can't be served to original customer, mark for reassignment
-                print(f"DEBUG: Marking {order} for reassignment")
-                self.carrying_food[i] = (None, order)
+                self.model.events.debug("waiter", "Marking %s for reassignment", order)
+                self.set_carried(i, None, order)
                 continue
 
         # Try to serve reassigned food
@@ -301,15 +398,12 @@ class WaiterAgent(mesa.Agent):
                 if target_customer.order_status in [OrderStatus.ORDERED, OrderStatus.DELIVERING]:
                     self._mark_customer_served(target_customer)
 
-                    # Get price info for debug output
-                    price = food_options.get(order, {}).get("price")
-                    print(
-                        f"DEBUG: Waiter {self.unique_id} served reassigned {order} "
-                        f"to customer {target_customer.unique_id} - "
-                        f"Price: ${price:.2f}")
+                    self.model.events.debug("waiter", "Waiter %s served reassigned %s to customer %s - Price: $%.2f",
+                                            self.unique_id, order, target_customer.unique_id,
+                                            food_options.get(order, {}).get("price"))
 
                     # Remove the served food from carrying
-                    self.carrying_food.pop(i)
+                    self.drop_carried(i)
                     return True
 
         return False
@@ -317,3 +411,4 @@ class WaiterAgent(mesa.Agent):
     def update_performance_metrics(self, customer):
         tip = customer.tip
         self.tips += tip
+        self.model.record_tip(self, tip)
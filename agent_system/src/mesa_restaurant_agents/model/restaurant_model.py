@@ -1,16 +1,97 @@
 import mesa
+from mesa.agent import AgentSet
 import numpy as np
 
-from ..agents.customer_agent import CustomerAgent
+from ..agents.customer_agent import ArrayCustomerAgent, CustomerAgent
 from ..agents.manager_agent import ManagerAgent
 from ..agents.waiter_agent import WaiterAgent
+from ..utils.agent_info_store import AgentInfoStore
+from ..utils.arrival_schedule import ArrivalSchedule
+from ..utils.cadenced_datacollector import CadencedDataCollector
+from ..utils.customer_engine import CustomerEngine
+from ..utils.dispatcher import Dispatcher
+from ..utils.event_engine import EventEngine
+from ..utils.event_log import EventLog, WARNING
+from ..utils.grid_trajectory import GridTrajectory
+from ..utils.results_sink import ResultsSink
 from ..utils.kitchen import Kitchen
+from ..utils.order_status import food_options
 from ..utils.restaurant_grid import RestaurantGrid
 
 
+def _cents(amount):
+    """Amount of money in whole cents"""
+    return round(amount * 100)
+
+
 class RestaurantModel(mesa.Model):
-    def __init__(self, n_waiters, grid_width, grid_height, seed=None):
+    # Opening hours in minutes of the day and the length of a model step in minutes
+    OPENING_HOUR = 11 * 60
+    CLOSING_HOUR = 23 * 60
+    TIME_STEP = 5
+
+    def __init__(self, n_waiters, grid_width, grid_height, seed=None, log_level=WARNING, log_buffer_size=0,
+                 agent_info_backend="dicts", grid_state_backend="dicts", collection_periods=None,
+                 results_sink=None, customer_backend="agents", dispatch="greedy", movement="sequential",
+                 shuffle_waiters=True, simulation="stepped", arrivals=None):
         super().__init__(seed=seed)
+        # mesa only seeds self.random from seed; seed the numpy generator too so that a seed fully
+        # determines the run. All randomness goes through self.random and self.rng.
+        if seed is not None:
+            self.rng = np.random.default_rng(int(seed))
+            self._rng = self.rng.bit_generator.state
+
+        # Leveled event log; events below log_level are never formatted
+        self.events = EventLog(self, level=log_level, buffer_size=log_buffer_size)
+
+        # Typed registries of the agents currently in the restaurant, kept up to date
+        # by register_agent/deregister_agent so lookups never scan all agents
+        self.customers = AgentSet([], random=self.random)
+        self.waiters = AgentSet([], random=self.random)
+
+        # Running totals over the registered agents, updated on arrival, departure,
+        # customer state changes and tips so the model reporters are O(1). Tips are whole
+        # cents, so their total is kept in integer cents and never drifts from a full scan.
+        self.total_waiting_time = 0
+        self.total_satisfaction = 0
+        self.total_tip_cents = 0
+
+        # Reverse index {customer: {waiter: items}} of the working waiters carrying food for a
+        # customer, maintained by WaiterAgent so departures do not scan every waiter
+        self.carried_orders = {}
+
+        # Customers waiting for food without an assigned waiter, per food type in arrival order
+        # (i.e. longest waiting first), so reassigning leftover food only looks at one bucket
+        self.waiting_by_food = {food: {} for food in food_options}
+
+        # Customer state is either kept on the agents, each updating itself in step() ("agents"),
+        # or in the NumPy columns of a CustomerEngine updated for all customers at once ("arrays")
+        if customer_backend not in ("agents", "arrays"):
+            raise ValueError(f"Unknown customer_backend: {customer_backend}")
+        self.customer_engine = CustomerEngine() if customer_backend == "arrays" else None
+        self.customer_cls = ArrayCustomerAgent if customer_backend == "arrays" else CustomerAgent
+
+        # Waiters either choose their orders and customers themselves ("greedy") or get them
+        # from a Dispatcher solving one assignment problem for all waiters per step ("batched")
+        if dispatch not in ("greedy", "batched"):
+            raise ValueError(f"Unknown dispatch: {dispatch}")
+        self.dispatcher = Dispatcher() if dispatch == "batched" else None
+
+        # Waiters either move one by one inside their step ("sequential") or all at once in a
+        # movement phase between choosing their targets and serving ("batched"); shuffle_waiters
+        # keeps the random waiter order of shuffle_do for the batched phases
+        if movement not in ("sequential", "batched"):
+            raise ValueError(f"Unknown movement: {movement}")
+        self.movement = movement
+        self.shuffle_waiters = shuffle_waiters
+
+        # Time either advances by time_step with every agent acting each step ("stepped") or
+        # from one event to the next in an EventEngine ("events"), sampled once per time_step
+        if simulation not in ("stepped", "events"):
+            raise ValueError(f"Unknown simulation: {simulation}")
+        if simulation == "events" and (dispatch != "greedy" or movement != "sequential"):
+            raise ValueError("simulation='events' requires dispatch='greedy' and movement='sequential'")
+        self.event_engine = EventEngine() if simulation == "events" else None
 
         self.multi_day_mode = True
         self.grid_height = grid_height if grid_height % 2 != 0 else grid_height + 1  # make sure grid_height is uneven
@@ -20,7 +101,7 @@ class RestaurantModel(mesa.Model):
         kitchen_x = (self.grid_width // 2) + 2 if self.grid_width % 2 == 1 else (self.grid_width // 2) + 2
         kitchen_y = (self.grid_width // 2) + 2 if self.grid_height % 2 == 1 else (self.grid_height // 2) + 2
         self.kitchen = Kitchen(pos=(kitchen_x, kitchen_y))
-        self.grid = RestaurantGrid(self.grid_width, self.grid_height, self.kitchen.pos)
+        self.grid = RestaurantGrid(self.grid_width, self.grid_height, self.kitchen.pos, random=self.random)
 
         # Initialize tracking variables
         self.revenue = 0
@@ -31,14 +112,24 @@ class RestaurantModel(mesa.Model):
         self.total_orders_served = 0
 
         # Time settings
-        self.opening_hour = 11 * 60
-        self.closing_hour = 23 * 60
-        self.time_step = 5
+        self.opening_hour = self.OPENING_HOUR
+        self.closing_hour = self.CLOSING_HOUR
+        self.time_step = self.TIME_STEP
         self.current_minute = self.opening_hour
 
+        # Arrivals either come from one Poisson draw per step at arrival_rate (arrivals=None) or from
+        # an ArrivalSchedule sampled once per day; the event engine always uses a schedule, by default
+        # one with the same rates
+        if arrivals is None and self.event_engine is not None:
+            arrivals = ArrivalSchedule.from_rate(self.arrival_rate, self.opening_hour, self.closing_hour,
+                                                 self.time_step)
+        self.arrivals = arrivals
+        self.day_arrivals = arrivals.sample(self.rng) if arrivals is not None else None
+
         # Add day tracking
         self.current_day = 1
         self.daily_record = [{}]  # For storing metrics across days
+        self.daily_history = []  # Record of every completed day, independent of the collection periods
 
         # Define shifts by time ranges (in minutes)
         self.shifts = {
@@ -82,27 +173,163 @@ class RestaurantModel(mesa.Model):
         self.width = self.grid_width
         self.height = self.grid_height
 
+        # Optionally stream all collected data to a run directory instead of keeping it in memory
+        if results_sink is not None and not isinstance(results_sink, ResultsSink):
+            results_sink = ResultsSink(results_sink, params={"n_waiters": n_waiters, "grid_width": grid_width,
+                                                             "grid_height": grid_height, "seed": seed})
+        self.results_sink = results_sink
+
+        # Per-agent snapshots either go into the DataCollector as lists of dicts ("dicts")
+        # or into growable NumPy columns in self.agent_info ("columnar")
+        if agent_info_backend not in ("dicts", "columnar"):
+            raise ValueError(f"Unknown agent_info_backend: {agent_info_backend}")
+        self.agent_info = AgentInfoStore(sink=results_sink) if agent_info_backend == "columnar" else None
+
+        # The grid state is either re-emitted on every step by the GridState reporter ("dicts")
+        # or delta-encoded in self.grid_trajectory ("trajectory")
+        if grid_state_backend not in ("dicts", "trajectory"):
+            raise ValueError(f"Unknown grid_state_backend: {grid_state_backend}")
+        self.grid_trajectory = None
+        if grid_state_backend == "trajectory":
+            self.grid_trajectory = GridTrajectory(sink=results_sink)
+            self.grid_trajectory.record_layout(self)
+
         # Set up data collection for model metrics
-        self.datacollector = mesa.DataCollector(
-            model_reporters={
-                "day": lambda m: m.current_day,
-                "shift": lambda m: m.get_current_shift(),
-                "time": lambda m: m.current_minute,
-                "Customer_Count": lambda m: m.get_customers_count(m.agents),
-                "Waiters_Count": lambda m: m.get_waiters_count(m.agents),
-                "Average_Wait_Time": lambda m: m.get_average_wait_time(),
-                "Average_Customer_Satisfaction": lambda m: m.get_average_satisfaction(),
-                "Revenue": lambda m: m.revenue,
-                "Tips": lambda m: m.get_total_tips(),
-                "Customer_Info": lambda m: m.get_customer_info(m.agents),
-                "Waiter_Info": lambda m: m.get_waiter_info(m.agents),
-                "GridState": lambda m: m.get_grid_state(),
-                "Daily_Stats": lambda m: m.daily_record,
-            }
-        )
+        model_reporters = {
+            "day": lambda m: m.current_day,
+            "shift": lambda m: m.get_current_shift(),
+            "time": lambda m: m.current_minute,
+            "Customer_Count": lambda m: m.get_customers_count(),
+            "Waiters_Count": lambda m: m.get_waiters_count(),
+            "Average_Wait_Time": lambda m: m.get_average_wait_time(),
+            "Average_Customer_Satisfaction": lambda m: m.get_average_satisfaction(),
+            "Revenue": lambda m: m.revenue,
+            "Tips": lambda m: m.get_total_tips(),
+            "Customer_Info": lambda m: m.get_customer_info(),
+            "Waiter_Info": lambda m: m.get_waiter_info(),
+            "GridState": lambda m: m.get_grid_state(),
+            "Daily_Stats": lambda m: m.daily_record,
+        }
+        if self.agent_info is not None:
+            del model_reporters["Customer_Info"], model_reporters["Waiter_Info"]
+        if self.grid_trajectory is not None:
+            del model_reporters["GridState"]
+        # Each reporter has its own collection period: a number of steps, "day" for once per day,
+        # or None to switch it off (e.g. {"Customer_Info": 12, "GridState": None, "Daily_Stats": "day"})
+        self.datacollector = CadencedDataCollector(model_reporters=model_reporters, periods=collection_periods,
+                                                   sink=results_sink)
+        if self.event_engine is not None:
+            self.event_engine.start_day(self)
+
         # Collect initial state
+        self.collect_data()
+
+    def collect_data(self):
+        """Collect the model reporters and, if enabled, the columnar agent snapshots and grid trajectory"""
+        # The stores follow the period of the reporter they replace
+        if self.agent_info is not None and self.datacollector.is_due("Customer_Info", self):
+            self.agent_info.collect(self)
+        if self.grid_trajectory is not None and self.datacollector.is_due("GridState", self):
+            self.grid_trajectory.collect(self)
         self.datacollector.collect(self)
 
+    def close_results(self):
+        """Write everything still held in memory to the results sink"""
+        if self.results_sink is None:
+            return
+        self.results_sink.close()
+        if self.agent_info is not None:
+            self.agent_info.flush()
+        if self.grid_trajectory is not None:
+            self.grid_trajectory.flush()
+
+    def register_agent(self, agent):
+        """Register agent with the model and add it to its typed registry"""
+        super().register_agent(agent)
+        if isinstance(agent, CustomerAgent):
+            self.customers.add(agent)
+            if isinstance(agent, ArrayCustomerAgent):
+                self.customer_engine.add(agent, order_minute=self.current_minute)
+            self.total_waiting_time += agent.waiting_time
+            self.total_satisfaction += agent.satisfaction
+        elif isinstance(agent, WaiterAgent):
+            self.waiters.add(agent)
+            self.total_tip_cents += _cents(getattr(agent, 'tips', 0))
+
+    def deregister_agent(self, agent):
+        """Deregister agent from the model and drop it from its typed registry"""
+        super().deregister_agent(agent)
+        if isinstance(agent, CustomerAgent) and agent in self.customers:
+            self.customers.discard(agent)
+            self.discard_waiting_customer(agent)
+            self.total_waiting_time -= agent.waiting_time
+            self.total_satisfaction -= agent.satisfaction
+            if isinstance(agent, ArrayCustomerAgent):
+                self.customer_engine.remove(agent)
+        elif isinstance(agent, WaiterAgent) and agent in self.waiters:
+            self.waiters.discard(agent)
+            self.total_tip_cents -= _cents(agent.tips)
+            for customer, _ in agent.carrying_food:
+                self.untrack_carried(customer, agent)
+
+    def record_tip(self, waiter, tip):
+        """Add a tip to the running total if the waiter is still working"""
+        if waiter in self.waiters:
+            self.total_tip_cents += _cents(tip)
+
+    def track_carried(self, customer, waiter):
+        """Record that a working waiter carries an item for customer"""
+        if customer is not None and waiter in self.waiters:
+            carriers = self.carried_orders.setdefault(customer, {})
+            carriers[waiter] = carriers.get(waiter, 0) + 1
+
+    def untrack_carried(self, customer, waiter):
+        """Undo track_carried for one item"""
+        carriers = self.carried_orders.get(customer)
+        if carriers and waiter in carriers:
+            carriers[waiter] -= 1
+            if not carriers[waiter]:
+                del carriers[waiter]
+                if not carriers:
+                    del self.carried_orders[customer]
+
+    def waiters_carrying(self, customer):
+        """Working waiters carrying food for customer"""
+        return list(self.carried_orders.get(customer, ()))
+
+    def add_waiting_customer(self, customer):
+        """Add a customer who placed an order to the waiting index"""
+        if self.has_customer(customer) and not customer.assigned_waiter:
+            self.waiting_by_food.setdefault(customer.food_preference, {})[customer] = None
+
+    def discard_waiting_customer(self, customer):
+        """Drop a customer from the waiting index once a waiter is assigned, food is served or they leave"""
+        bucket = self.waiting_by_food.get(getattr(customer, 'food_preference', None))
+        if bucket:
+            bucket.pop(customer, None)
+
+    def customer_served(self, customer):
+        """Drop a customer who got their food from the waiting index (and let the event engine know)"""
+        self.discard_waiting_customer(customer)
+        if self.event_engine is not None:
+            self.event_engine.customer_served(customer)
+
+    def assign_waiter(self, customer, waiter):
+        """Make waiter the customer's assigned waiter"""
+        customer.assigned_waiter = [waiter]
+        self.discard_waiting_customer(customer)
+
+    def waiting_customers(self, food):
+        """Unassigned customers waiting for food, longest waiting first"""
+        return iter(self.waiting_by_food.get(food, ()))
+
+    def count_waiting_customers(self):
+        return sum(len(bucket) for bucket in self.waiting_by_food.values())
+
+    def has_customer(self, customer):
+        """Check in O(1) whether a customer is still in the restaurant"""
+        return customer in self.customers
+
     def get_grid_state(self):
         """Return lightweight grid state representation"""
         state = []
@@ -140,12 +367,11 @@ class RestaurantModel(mesa.Model):
                 self.grid.place_agent(agent, self.kitchen.pos)
             # Position other agent types randomly
             elif not self.grid.position_randomly(agent):
-                self.agents.remove(agent)
+                agent.remove()
 
-    def get_customer_info(self, agents):
-        customers = agents.select(agent_type=CustomerAgent)
+    def get_customer_info(self):
         c_infos = []
-        for customer in customers:
+        for customer in self.customers:
             c_info = {"customer_nr": customer.unique_id,
                       "waiting_time": customer.waiting_time,
                       "order_status": customer.order_status.value,
@@ -153,33 +379,36 @@ class RestaurantModel(mesa.Model):
             c_infos.append(c_info)
         return c_infos
 
-    def get_waiter_info(self, agents):
-        waiters = agents.select(agent_type=WaiterAgent)
+    def get_waiter_info(self):
         w_infos = []
-        for waiter in waiters:
+        for waiter in self.waiters:
             w_info = {"waiter_nr": waiter.unique_id,
                       "tips": waiter.tips,
                       "served_customers": waiter.served_customers}
             w_infos.append(w_info)
         return w_infos
 
-    def get_customers_count(self, agents):
-        return len(agents.select(agent_type=CustomerAgent))
+    def get_customers_count(self):
+        return len(self.customers)
     
-    def get_waiters_count(self, agents):
-        return len(agents.select(agent_type=WaiterAgent))
+    def get_waiters_count(self):
+        return len(self.waiters)
 
-    def is_peak_hour(self):
-        """Check if current time is during peak hours"""
-        hour = self.current_minute // 60
+    def is_peak_hour(self, minute=None):
+        """Check if current time (or minute) is during peak hours"""
+        hour = (self.current_minute if minute is None else minute) // 60
         return (12 <= hour <= 14) or (17 <= hour <= 20)
 
-    def calculate_new_customers(self):
-        """Calculate number of new customers based on time of day"""
+    def arrival_rate(self, minute=None):
+        """Expected number of new customers per time step at minute (default: now), based on time of day"""
         base_rate = 0.8  # Base arrival rate (non-peak)
-        if self.is_peak_hour():
+        if self.is_peak_hour(minute):
             base_rate = 6  # Increased arrival rate during peak hours
-        return np.random.poisson(base_rate)  # Random variation in arrivals
+        return base_rate
+
+    def calculate_new_customers(self):
+        """Calculate number of new customers based on time of day"""
+        return self.rng.poisson(self.arrival_rate())  # Random variation in arrivals
 
     def get_current_shift(self):
         current_shift = None
@@ -196,50 +425,73 @@ class RestaurantModel(mesa.Model):
         current_shift = self.get_current_shift()
 
         for _ in range(n_new):
-            customer = CustomerAgent(model=self)
-            customer.order_time = self.current_minute
-            self.agents.add(customer)
-            self.grid.position_randomly(customer)  # Use direct grid positioning
-            self.kitchen.add_new_customer_order(customer, customer.food_preference, customer.order_time)
+            self.add_customer(current_shift)
 
-            # Track customer by shift
-            if current_shift:
-                self.shift_customers[current_shift] += 1
+    def add_scheduled_customers(self):
+        """Seat the customers of the day's ArrivalSchedule who arrived by now
+
+        Arrivals are rounded up to step boundaries: a customer who arrived since the previous
+        step is seated now and orders at the current minute, not at the drawn one. The last
+        step that seats customers also seats everyone drawn before closing time, so no arrival
+        in the final minutes of the day is lost.
+        """
+        current_shift = self.get_current_shift()
+        until = self.current_minute
+        if until + self.time_step >= self.closing_hour:
+            until = self.closing_hour - 1
+        for food_preference, dining_duration, table_draw in self.day_arrivals.until(until):
+            self.add_customer(current_shift, food_preference, dining_duration, table_draw)
+
+    def add_customer(self, shift=None, food_preference=None, dining_duration=None, table_draw=None):
+        """Seat a new customer and send their order to the kitchen"""
+        customer = self.customer_cls(model=self, food_preference=food_preference, dining_duration=dining_duration)
+        customer.order_time = self.current_minute
+        self.agents.add(customer)
+        self.grid.position_randomly(customer, table_draw)  # Use direct grid positioning
+        self.kitchen.add_new_customer_order(customer, customer.food_preference, customer.order_time)
+
+        # Track customer by shift
+        if shift is None:
+            shift = self.get_current_shift()
+        if shift:
+            self.shift_customers[shift] += 1
+        return customer
 
     def remove_customer(self, customer):
         """Remove customer from restaurant tracking"""
-        if customer in self.agents.select(agent_type=CustomerAgent):
+        if self.has_customer(customer):
             self.grid.remove_agent(customer)
-            self.agents.remove(customer)
+            customer.remove()
 
     def get_average_wait_time(self):
         """Calculate average wait time safely"""
-        customers = self.agents.select(agent_type=CustomerAgent)
-        if not customers:
+        if not self.customers:
             return 0.0
-        return sum(c.waiting_time for c in customers) / len(customers)
+        return self.total_waiting_time / len(self.customers)
 
     def get_average_satisfaction(self):
         """Calculate average satisfaction safely"""
-        customers = self.agents.select(agent_type=CustomerAgent)
-        if not customers:
+        if not self.customers:
             return 100.0
-        return sum(c.satisfaction for c in customers) / len(customers)
+        return self.total_satisfaction / len(self.customers)
 
     def reset_for_new_day(self):
         """Reset restaurant state for a new day while preserving persistent data"""
         # Calculate additional stats
         stats = self.get_daily_stats()
 
-        # Print revenue report
-        print(f"===== Day {self.current_day} Revenue Report =====")
-        print(f"Food revenue: ${stats['food_revenue']:.2f}")
-        print(f"Tips collected: ${stats['tips']:.2f}")
-        print(f"Total revenue: ${stats['total_revenue']:.2f}")
-        print(f"Customers paid: {stats['customers_paid']}")
-        print(f"Customers left without paying: {stats['customers_left']}")
-        print(f"Total orders served: {stats['served_customers']}")
-        print(f"===================================")
+        # Log revenue report
+        self.events.info("model",
+                         "===== Day %d Revenue Report =====\n"
+                         "Food revenue: $%.2f\n"
+                         "Tips collected: $%.2f\n"
+                         "Total revenue: $%.2f\n"
+                         "Customers paid: %d\n"
+                         "Customers left without paying: %d\n"
+                         "Total orders served: %d\n"
+                         "===================================",
+                         self.current_day, stats['food_revenue'], stats['tips'], stats['total_revenue'],
+                         stats['customers_paid'], stats['customers_left'], stats['served_customers'])
 
         # Store daily stats before resetting
         self.daily_record[0] = {
@@ -252,6 +504,9 @@ class RestaurantModel(mesa.Model):
             'served_orders': stats['served_customers'],
             'avg_satisfaction': self.get_average_satisfaction()
         }
+        self.daily_history.append(self.daily_record[0])
+        if self.results_sink is not None:
+            self.results_sink.append_records("daily", [self.daily_record[0]])
 
         # Before advancing day counter, apply the manager's optimized schedule
         #print(f"DEBUG: Day {self.current_day} completed, resetting for day {self.current_day + 1}")
@@ -259,16 +514,19 @@ class RestaurantModel(mesa.Model):
 
         # Apply manager's schedule if available
         if hasattr(self.manager, 'waiters_assigned_count') and any(self.manager.waiters_assigned_count.values()):
-            print(f"Applying manager's schedule for day {self.current_day + 1}")
-            print(f"Predicted customers: {self.manager.predicted_customers}")
-            print(f"Waiters per shift: {self.manager.waiters_assigned_count}")
+            self.events.info("schedule", "Applying manager's schedule for day %d\n"
+                                         "Predicted customers: %s\nWaiters per shift: %s",
+                             self.current_day + 1, self.manager.predicted_customers,
+                             self.manager.waiters_assigned_count)
         else:
-            print(f"No schedule available for day {self.current_day + 1}, using defaults")
+            self.events.info("schedule", "No schedule available for day %d, using defaults", self.current_day + 1)
             if not hasattr(self.manager, 'waiters_assigned_count'):
                 self.manager.waiters_assigned_count = {1: 4, 2: 4, 3: 4}  # Default to 4 waiters per shift if not set
 
         # Reset time to opening hour
         self.current_minute = self.opening_hour
+        if self.arrivals is not None:
+            self.day_arrivals = self.arrivals.sample(self.rng)
 
         # Reset daily counters
         self.customers_paid = 0
@@ -277,23 +535,23 @@ class RestaurantModel(mesa.Model):
         self.total_orders_served = 0
 
         # Reset kitchen orders
-        self.kitchen.requested_orders.clear()
-        self.kitchen.prepared_orders.clear()
+        self.kitchen.clear()
 
         # Reset shift customer counts
         self.shift_customers = {1: 0, 2: 0, 3: 0}
 
         # Remove any remaining customers from previous day
-        customers_to_remove = self.agents.select(agent_type=CustomerAgent)
+        customers_to_remove = list(self.customers)
         for customer in customers_to_remove:
             self.grid.remove_agent(customer)
-            self.agents.remove(customer)
+            customer.remove()
 
         # Reset waiters' daily assignments
-        for waiter in self.agents.select(agent_type=WaiterAgent):
+        for waiter in self.waiters:
             waiter.current_customer = None
             waiter.has_order_to_deliver = False
             waiter.carrying_food = []  # Clear any carried food
+            waiter.route = []
             waiter.target_pos = None
 
             # Reset position to kitchen
@@ -309,14 +567,17 @@ class RestaurantModel(mesa.Model):
         #print(f"DEBUG: Opening hour: {self.opening_hour}, Closing hour: {self.closing_hour}")
 
         # Create waiters for first shift after reset
-        print(f"Creating waiters for first shift of day {self.current_day}")
+        self.events.info("model", "Creating waiters for first shift of day %d", self.current_day)
         first_shift = min(self.shifts.keys())
         self.create_waiters_for_shift(first_shift)
 
+        if self.event_engine is not None:
+            self.event_engine.start_day(self)
+
     def create_waiters_for_shift(self, shift_id):
         """Create waiters for the specified shift based on manager's schedule"""
         if not self.manager or not hasattr(self.manager, 'schedule'):
-            print(f"Warning: No manager or schedule found for shift {shift_id}")
+            self.events.warning("schedule", "No manager or schedule found for shift %s", shift_id)
             return
 
         # Default min waiters if on day 1 or no schedule exists
@@ -326,18 +587,19 @@ class RestaurantModel(mesa.Model):
             waiters_needed = self.manager.waiters_assigned_count.get(shift_id, 4) # Default to 4 if not set
 
         # Get current waiters
-        current_waiters = list(self.agents.select(agent_type=WaiterAgent))
+        current_waiters = list(self.waiters)
         current_count = len(current_waiters)
 
-        print(f"Shift {shift_id}: {waiters_needed} waiters needed, {current_count} currently active")
+        self.events.info("model", "Shift %s: %d waiters needed, %d currently active",
+                         shift_id, waiters_needed, current_count)
 
         # Case 1: Remove excess waiters
         if current_count > waiters_needed:
             waiters_to_remove = current_waiters[waiters_needed:]
             for waiter in waiters_to_remove:
                 self.grid.remove_agent(waiter)
-                self.agents.remove(waiter)
-            print(f"Removed {len(waiters_to_remove)} excess waiters")
+                waiter.remove()
+            self.events.info("model", "Removed %d excess waiters", len(waiters_to_remove))
 
         # Case 2: Add new waiters
         elif current_count < waiters_needed:
@@ -358,13 +620,13 @@ class RestaurantModel(mesa.Model):
 
                 self.agents.add(waiter_agent)
                 self.grid.place_agent(waiter_agent, self.kitchen.pos)
-            print(f"Added {waiters_to_add} new waiters")
+            self.events.info("model", "Added %d new waiters", waiters_to_add)
 
         else:
-            print(f"No change in waiters for shift {shift_id}")
+            self.events.info("model", "No change in waiters for shift %s", shift_id)
 
         # Reset all waiters for the new shift
-        for waiter in self.agents.select(agent_type=WaiterAgent):
+        for waiter in self.waiters:
             # Update shift assignment
             waiter.shift = shift_id
 
@@ -378,10 +640,29 @@ class RestaurantModel(mesa.Model):
         #        f"target_pos={w.target_pos}"
         #    )
 
+    def step_waiters_batched(self, shuffle=True):
+        """Let all waiters choose their targets, move them in one batch, then let each serve or pick up food"""
+        waiters = list(self.waiters)
+        if shuffle:
+            self.random.shuffle(waiters)
+        for waiter in waiters:
+            waiter.prepare_move()
+        self.grid.advance_along_paths(waiters)
+        for waiter in waiters:
+            waiter.step(moved=True)
+
+    @property
+    def steps_per_day(self):
+        """Number of steps from opening to closing hour, i.e. in one simulated day"""
+        return (self.closing_hour - self.opening_hour) // self.time_step
+
+    @property
+    def total_tips(self):
+        return self.total_tip_cents / 100
+
     def get_total_tips(self):
-        total_tips = sum(waiter.tips for waiter in self.agents
-                         if hasattr(waiter, 'tips'))
-        return total_tips
+        """Tips of the working waiters; equals round(sum(waiter.tips), 2) over self.waiters"""
+        return self.total_tips
         
     def get_daily_stats(self):
         """Get daily statistics for debugging and reporting"""
@@ -406,30 +687,38 @@ class RestaurantModel(mesa.Model):
     def step(self):
         """Advance simulation by one time step"""
         # Update metrics
-        self.customer_count = len(self.agents.select(agent_type=CustomerAgent))
-        self.datacollector.collect(self)
+        self.customer_count = len(self.customers)
+        self.collect_data()
 
-        self.current_minute += self.time_step
+        if self.event_engine is not None:
+            # Customers and waiters act in the events up to the next sample point
+            self.event_engine.run_until(self, self.current_minute + self.time_step)
+        else:
+            self.current_minute += self.time_step
 
         # Create waiters at the beginning of each shift
         for shift_id, shift_info in self.shifts.items():
             if self.current_minute == shift_info["start"]:
-                print(f"Starting shift {shift_id}: {shift_info['name']}")
+                self.events.info("model", "Starting shift %s: %s", shift_id, shift_info['name'])
                 self.create_waiters_for_shift(shift_id)
+                if self.event_engine is not None:
+                    self.event_engine.activate_idle(self)
 
         # print(f"DEBUG: After reset - current_minute: {self.current_minute}, day: {self.current_day}")
         # print(f"DEBUG: Opening hour: {self.opening_hour}, Closing hour: {self.closing_hour}")
 
         # Debug customer generation attempts
-        if self.opening_hour <= self.current_minute < self.closing_hour:
-            self.add_new_customers()
-
-        if self.current_minute % 60 == 0:  # Print stats every hour
-            hour_24_format = self.current_minute // 60
-            print(f"Day {self.current_day}, Hour {hour_24_format}:00:")
-            print(f"Customers paid: {self.customers_paid}")
-            print(f"Customers left without paying: {self.customers_left_without_paying}")
-            print(f"Current Revenue: ${self.revenue:.2f}\n")
+        if self.event_engine is None and self.opening_hour <= self.current_minute < self.closing_hour:
+            if self.day_arrivals is not None:
+                self.add_scheduled_customers()
+            else:
+                self.add_new_customers()
+
+        if self.current_minute % 60 == 0:  # Log stats every hour
+            self.events.info("model", "Day %d, Hour %d:00:\nCustomers paid: %d\n"
+                                      "Customers left without paying: %d\nCurrent Revenue: $%.2f",
+                             self.current_day, self.current_minute // 60, self.customers_paid,
+                             self.customers_left_without_paying, self.revenue)
 
         #print(
         #    f"DEBUG: Day {self.current_day}, minute {self.current_minute}: "
@@ -439,9 +728,35 @@ class RestaurantModel(mesa.Model):
         # Process kitchen orders
         self.kitchen.add_ready_orders_to_prepared(self.current_minute)
 
+        if self.dispatcher is not None:
+            self.dispatcher.step(self)
+
         # Update all agents EXCEPT the manager at end of day
         # This prevents the manager's step from being called twice
-        if self.current_minute >= self.closing_hour - self.time_step:
+        if self.event_engine is not None:
+            pass  # Agents already acted in run_until
+        elif self.movement == "batched":
+            end_of_day = self.current_minute >= self.closing_hour - self.time_step
+            if self.customer_engine is not None:
+                self.customer_engine.step(self)
+            elif end_of_day:
+                for customer in list(self.customers):
+                    customer.step()
+            else:
+                self.customers.shuffle_do("step")
+            self.step_waiters_batched(shuffle=self.shuffle_waiters and not end_of_day)
+            if not end_of_day:
+                self.manager.step()
+        elif self.customer_engine is not None:
+            # All customers are updated at once, before the waiters act
+            self.customer_engine.step(self)
+            if self.current_minute >= self.closing_hour - self.time_step:
+                for waiter in list(self.waiters):
+                    waiter.step()
+            else:
+                self.waiters.shuffle_do("step")
+                self.manager.step()
+        elif self.current_minute >= self.closing_hour - self.time_step:
             agents_copy = list(self.agents)
             for agent in agents_copy:
                 if not isinstance(agent, ManagerAgent):
@@ -451,7 +766,7 @@ class RestaurantModel(mesa.Model):
 
         # Process manager at end of day explicitly so it happens AFTER all customer data is collected
         if self.current_minute >= self.closing_hour - self.time_step:
-            manager = next(iter(self.agents.select(agent_type=ManagerAgent)), None)
+            manager = self.manager
             if manager:
                 # Skip redundant manager step call if we're about to transition days
                 if not (self.multi_day_mode and self.current_minute >= self.closing_hour):
@@ -467,4 +782,4 @@ class RestaurantModel(mesa.Model):
         #      f"{len(self.kitchen.prepared_orders)} prepared")
 
         # Update metrics
-        self.customer_count = len(self.agents.select(agent_type=CustomerAgent))
+        self.customer_count = len(self.customers)
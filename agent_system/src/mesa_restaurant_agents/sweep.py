@@ -0,0 +1,131 @@
+import itertools
+import json
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from tqdm.auto import tqdm
+
+from .model.restaurant_model import RestaurantModel
+from .utils.run_cache import RunCache
+
+# RunCache.get default for runs not in the cache; None is a valid reducer result
+_MISS = object()
+
+
+def daily_revenue(model):
+    """Reducer returning the revenue of every completed day"""
+    return [record['revenue'] for record in model.daily_history]
+
+
+def final_model_vars(model):
+    """Reducer returning the last collected row of the model reporters"""
+    df = model.datacollector.get_model_vars_dataframe()
+    return df.iloc[-1].to_dict() if len(df) else {}
+
+
+def make_runs(parameters, iterations=1):
+    """Expand a dict of parameter values/lists into one kwargs dict per run (like mesa's batch_run)
+
+    A list of dicts is taken as the explicit list of parameter combinations.
+    """
+    if isinstance(parameters, list):
+        return [(dict(params), iteration) for params in parameters for iteration in range(iterations)]
+    names = list(parameters)
+    values = [value if isinstance(value, (list, tuple, range)) else [value] for value in parameters.values()]
+    return [(dict(zip(names, combination)), iteration)
+            for combination in itertools.product(*values)
+            for iteration in range(iterations)]
+
+
+def run_seed(params, iteration, base_seed=0):
+    """Deterministic seed for a run, derived from its parameters rather than its position in the sweep"""
+    key = zlib.crc32(json.dumps(params, sort_keys=True, default=str).encode())
+    return int(np.random.SeedSequence([base_seed, iteration, key]).generate_state(1)[0])
+
+
+def _run_one(task):
+    """Run a single configuration and reduce it inside the worker"""
+    index, params, iteration, seed, reducer, model_cls, model_kwargs = task
+    kwargs = dict(model_kwargs)
+    kwargs.update(params)
+    days = kwargs.pop("days", None)
+    steps = kwargs.pop("max_steps", None)
+    kwargs["seed"] = seed
+
+    model = model_cls(**kwargs)
+    if steps is None:
+        steps = (days or 1) * model.steps_per_day
+    for _ in range(steps):
+        if not model.running:
+            break
+        model.step()
+    if getattr(model, 'results_sink', None) is not None:
+        model.close_results()
+
+    return index, {"params": params, "iteration": iteration, "seed": seed, "result": reducer(model)}
+
+
+def run_sweep(parameters, reducer=daily_revenue, iterations=1, processes=None, base_seed=0,
+              model_cls=RestaurantModel, model_kwargs=None, display_progress=True, cache_dir=None):
+    """
+    Run a parameter sweep over a process pool, reducing every run inside its worker.
+
+    Parameters:
+    parameters (dict or list): Model parameters, each a single value or a list of values to sweep over,
+        or an explicit list of parameter dicts. `days` (number of simulated days, each
+        model.steps_per_day steps) or `max_steps` set the run length.
+    reducer (callable): Picklable function called with the finished model in the worker; only its
+        return value is sent back to the parent process.
+    iterations (int): Number of repetitions per parameter combination.
+    processes (int): Number of worker processes; 1 runs everything in the current process,
+        None uses one process per CPU.
+    base_seed (int): Seed from which every run's seed is derived (see run_seed).
+    model_kwargs (dict): Fixed keyword arguments for every model, e.g. collection_periods.
+    cache_dir (str): Directory of a RunCache; runs whose (parameters, seed, model_kwargs, model_cls,
+        reducer, package version) were computed before are read from it instead of being simulated
+        again. Parameters and model_kwargs then have to be JSON-serializable and the reducer and
+        model class defined at module level.
+
+    Returns:
+    list: One dict per run with `params`, `iteration`, `seed` and the reducer's `result`,
+        in the order of the expanded parameter combinations.
+    """
+    model_kwargs = model_kwargs or {}
+    runs = make_runs(parameters, iterations)
+    tasks = [(index, params, iteration, run_seed(params, iteration, base_seed), reducer, model_cls, model_kwargs)
+             for index, (params, iteration) in enumerate(runs)]
+    results = [None] * len(tasks)
+
+    cache = RunCache(cache_dir) if cache_dir is not None else None
+    keys = {}
+    if cache is not None:
+        pending = []
+        for task in tasks:
+            index, params, iteration, seed = task[:4]
+            keys[index] = RunCache.key(params, seed, model_kwargs, reducer, model_cls)
+            cached = cache.get(keys[index], _MISS)
+            if cached is _MISS:
+                pending.append(task)
+            else:
+                results[index] = {"params": params, "iteration": iteration, "seed": seed, "result": cached}
+        tasks = pending
+
+    def store(index, result):
+        results[index] = result
+        if cache is not None:
+            cache.put(keys[index], result["result"])
+
+    with tqdm(total=len(tasks), disable=not display_progress) as progress:
+        if processes == 1:
+            for task in tasks:
+                store(*_run_one(task))
+                progress.update()
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                futures = [executor.submit(_run_one, task) for task in tasks]
+                for future in as_completed(futures):
+                    store(*future.result())
+                    progress.update()
+
+    return results
@@ -0,0 +1,95 @@
+import numpy as np
+
+from .column_store import ColumnStore
+from .results_sink import ResultsRun
+
+
+class AgentInfoStore:
+    """
+    Columnar storage for the per-step customer and waiter snapshots.
+
+    Replaces the list-of-dicts Customer_Info/Waiter_Info reporters: every collection
+    appends one row per agent to growable NumPy columns, and DataFrames in the
+    same long format as the dict reporters (one row per agent and step, plus
+    step/day/time) are only built when requested. With a `ResultsSink` the rows
+    are moved to disk whenever a chunk is full.
+    """
+
+    CUSTOMER_COLUMNS = {
+        "step": np.int32,
+        "customer_nr": np.int32,
+        "waiting_time": np.int32,
+        "order_status": np.int8,
+        "satisfaction": np.float64,
+    }
+    WAITER_COLUMNS = {
+        "step": np.int32,
+        "waiter_nr": np.int32,
+        "tips": np.float64,
+        "served_customers": np.int32,
+    }
+    STEP_COLUMNS = {
+        "step": np.int32,
+        "day": np.int16,
+        "time": np.int16,
+    }
+
+    # Table names in a ResultsSink
+    SINK_TABLES = {"steps": "agent_steps", "customers": "customer_info", "waiters": "waiter_info"}
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.steps = ColumnStore(self.STEP_COLUMNS, capacity=256)
+        self.customers = ColumnStore(self.CUSTOMER_COLUMNS)
+        self.waiters = ColumnStore(self.WAITER_COLUMNS)
+
+    def collect(self, model):
+        step = model.steps
+        self.steps.append(1, step=step, day=model.current_day, time=model.current_minute)
+
+        customers = model.customers
+        n = len(customers)
+        if n:
+            ids, waiting, status, satisfaction = zip(*[
+                (c.unique_id, c.waiting_time, c.order_status.value, c.satisfaction) for c in customers])
+            self.customers.append(n, step=step, customer_nr=ids, waiting_time=waiting,
+                                  order_status=status, satisfaction=satisfaction)
+
+        waiters = model.waiters
+        n = len(waiters)
+        if n:
+            ids, tips, served = zip(*[(w.unique_id, w.tips, w.served_customers) for w in waiters])
+            self.waiters.append(n, step=step, waiter_nr=ids, tips=tips, served_customers=served)
+
+        if self.sink is not None and len(self.customers) >= self.sink.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Move all rows held in memory to the sink"""
+        if self.sink is None:
+            return
+        for attr, table in self.SINK_TABLES.items():
+            self.sink.append_columns(table, getattr(self, attr).drain())
+
+    def nbytes(self):
+        return self.steps.nbytes() + self.customers.nbytes() + self.waiters.nbytes()
+
+    def _with_step_info(self, attr):
+        if self.sink is not None:
+            self.flush()
+            run = ResultsRun(self.sink.path)
+            df = run.to_dataframe(self.SINK_TABLES[attr])
+            steps = run.to_dataframe(self.SINK_TABLES["steps"])
+        else:
+            df = getattr(self, attr).to_dataframe()
+            steps = self.steps.to_dataframe()
+        steps = steps.drop_duplicates("step", keep="last")
+        return df.merge(steps, on="step", how="left")
+
+    def customer_dataframe(self):
+        """Customer snapshots as a DataFrame with one row per customer and step"""
+        return self._with_step_info("customers")
+
+    def waiter_dataframe(self):
+        """Waiter snapshots as a DataFrame with one row per waiter and step"""
+        return self._with_step_info("waiters")
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from .order_status import food_options
+
+
+class DayArrivals:
+    """
+    The arrivals of one day, sorted by minute, with their food preference, dining
+    duration and a uniform draw in [0, 1) that picks their table among the free ones.
+    """
+
+    def __init__(self, minutes, food, dining_duration, table_draw):
+        self.minutes = minutes
+        self.food = food
+        self.dining_duration = dining_duration
+        self.table_draw = table_draw
+        self._foods = list(food_options)
+        self._next = 0
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def __getitem__(self, i):
+        """(food_preference, dining_duration, table_draw) of arrival i"""
+        return self._foods[self.food[i]], int(self.dining_duration[i]), float(self.table_draw[i])
+
+    def until(self, minute):
+        """Arrivals up to and including minute that were not returned before"""
+        end = int(np.searchsorted(self.minutes, minute, side="right"))
+        start, self._next = self._next, max(self._next, end)
+        return [self[i] for i in range(start, end)]
+
+
+class ArrivalSchedule:
+    """
+    Daily customer arrivals as a non-homogeneous Poisson process.
+
+    `intensity` is the expected number of arrivals per `resolution` minutes (1 for a
+    per-minute, 60 for a per-hour curve) from minute `start` of the day on. `food_mix`
+    gives the probability of every food in food_options, either fixed ({food: weight})
+    or as one row of weights per intensity interval. `sample` draws a whole day at once:
+    one Poisson draw over the per-minute intensities plus one draw per arrival attribute.
+    """
+
+    def __init__(self, intensity, resolution=1, start=11 * 60, food_mix=None, dining_duration=(60, 120)):
+        intensity = np.asarray(intensity, dtype=np.float64)
+        self.start = start
+        self.per_minute = np.repeat(intensity / resolution, resolution)
+        self.dining_duration = dining_duration
+
+        foods = list(food_options)
+        if food_mix is None:
+            mix = np.ones((1, len(foods)))
+        elif isinstance(food_mix, dict):
+            mix = np.array([[food_mix.get(food, 0) for food in foods]], dtype=np.float64)
+        else:
+            mix = np.repeat(np.asarray(food_mix, dtype=np.float64), resolution, axis=0)
+            if mix.shape != (len(self.per_minute), len(foods)):
+                raise ValueError(f"food_mix needs one row of {len(foods)} weights per intensity interval")
+        # Cumulative food probabilities per minute (a single row when the mix is fixed)
+        self._food_cdf = np.cumsum(mix / mix.sum(axis=1, keepdims=True), axis=1)
+
+    @classmethod
+    def from_rate(cls, rate, start, end, time_step, **kwargs):
+        """Schedule from a function giving the expected arrivals per time step at a minute"""
+        return cls([rate(minute) / time_step for minute in range(start, end)], start=start, **kwargs)
+
+    @classmethod
+    def from_shift_counts(cls, counts, shifts, **kwargs):
+        """Schedule spreading the expected customers of every shift evenly over its minutes
+
+        Parameters:
+        counts (dict): Expected customers per shift id.
+        shifts (dict): {shift_id: {"start": minute, "end": minute}}, like RestaurantModel.shifts.
+        """
+        start = min(shift["start"] for shift in shifts.values())
+        end = max(shift["end"] for shift in shifts.values())
+        intensity = np.zeros(end - start)
+        for shift_id, shift in shifts.items():
+            minutes = shift["end"] - shift["start"]
+            intensity[shift["start"] - start:shift["end"] - start] = counts.get(shift_id, 0) / minutes
+        return cls(intensity, start=start, **kwargs)
+
+    @classmethod
+    def from_csv(cls, path, shifts, **kwargs):
+        """Schedule from customer counts per shift in the ScheduleOptimizer training data layout
+        (columns Shift and Customers, averaged over all rows of a shift)"""
+        counts = pd.read_csv(path).groupby("Shift")["Customers"].mean().to_dict()
+        return cls.from_shift_counts(counts, shifts, **kwargs)
+
+    def sample(self, rng):
+        """Draw the arrivals of one day with the numpy Generator rng"""
+        counts = rng.poisson(self.per_minute)
+        offsets = np.repeat(np.arange(len(counts)), counts)
+        n = len(offsets)
+
+        cdf = self._food_cdf[offsets] if len(self._food_cdf) > 1 else self._food_cdf
+        food = (rng.random((n, 1)) >= cdf[:, :-1]).sum(axis=1)
+        low, high = self.dining_duration
+        return DayArrivals(self.start + offsets, food, rng.integers(low, high + 1, size=n), rng.random(n))
@@ -0,0 +1,96 @@
+import types
+from copy import deepcopy
+from functools import partial
+
+import mesa
+
+from .results_sink import ResultsRun
+
+# Collection period meaning "on the first collection of every simulated day"
+DAILY = "day"
+
+
+class CadencedDataCollector(mesa.DataCollector):
+    """
+    DataCollector whose model reporters each have their own collection period.
+
+    A period is either a number of steps (1 collects on every step), `DAILY` to
+    collect on the first collection of each day, or None/0 to switch the reporter
+    off. Switched-off reporters are not registered at all, so they cost nothing and
+    do not appear in the results. Reporters that are not due on a step store None,
+    which keeps every column aligned with the step index mesa's batch_run relies on.
+
+    With a `ResultsSink` the rows are streamed to disk instead of being kept in
+    `model_vars`, and `get_model_vars_dataframe` reads the numeric columns back.
+
+    Agent and agent-type reporters and tables work as in mesa's DataCollector:
+    agent reporters are collected on every collection and kept in memory.
+    """
+
+    def __init__(self, model_reporters=None, periods=None, sink=None, **kwargs):
+        self.periods = dict(periods or {})
+        for name, period in self.periods.items():
+            if period not in (None, DAILY) and (not isinstance(period, int) or period < 0):
+                raise ValueError(f"Invalid collection period for {name}: {period}")
+
+        model_reporters = {name: reporter for name, reporter in (model_reporters or {}).items()
+                           if self.is_enabled(name)}
+        super().__init__(model_reporters=model_reporters, **kwargs)
+        self.sink = sink
+        self._last_day = None
+
+    def is_enabled(self, name):
+        return bool(self.periods.get(name, 1))
+
+    def is_due(self, name, model):
+        """Check whether a reporter (or a store collected alongside it) is due at the current step"""
+        period = self.periods.get(name, 1)
+        if not period:
+            return False
+        if period == DAILY:
+            return model.current_day != self._last_day
+        return model.steps % period == 0
+
+    @staticmethod
+    def report(reporter, model):
+        """Evaluate a model reporter of any kind mesa's DataCollector accepts"""
+        # Functions and partials get the model, strings name a model attribute,
+        # [function, args] lists are called with their arguments, other callables
+        # (e.g. bound methods) with none
+        if isinstance(reporter, types.LambdaType | partial):
+            return reporter(model)
+        if isinstance(reporter, str):
+            return getattr(model, reporter, None)
+        if isinstance(reporter, list):
+            return reporter[0](*reporter[1])
+        return reporter()
+
+    def collect(self, model):
+        """Collect the model reporters that are due, storing None for the others"""
+        if self.sink is not None:
+            row = {"Step": model.steps}
+            for name, reporter in self.model_reporters.items():
+                row[name] = self.report(reporter, model) if self.is_due(name, model) else None
+            self.sink.append_row(row)
+        else:
+            for name, reporter in self.model_reporters.items():
+                if self.is_due(name, model):
+                    self.model_vars[name].append(deepcopy(self.report(reporter, model)))
+                else:
+                    self.model_vars[name].append(None)
+        self._last_day = model.current_day
+
+        # Agent-level reporters are recorded with mesa's DataCollector helpers
+        if self.agent_reporters:
+            self._agent_records[model.steps] = list(self._record_agents(model))
+        if self.agenttype_reporters:
+            self._agenttype_records[model.steps] = {
+                agent_type: list(self._record_agenttype(model, agent_type))
+                for agent_type in self.agenttype_reporters
+            }
+
+    def get_model_vars_dataframe(self):
+        if self.sink is None:
+            return super().get_model_vars_dataframe()
+        self.sink.flush()
+        return ResultsRun(self.sink.path).to_dataframe().set_index("Step")
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+
+class ColumnStore:
+    """Append-only table of NumPy columns whose capacity grows geometrically"""
+
+    def __init__(self, dtypes, capacity=1024):
+        self.dtypes = dict(dtypes)
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.dtypes.items()}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(next(iter(self._columns.values())))
+
+    def _reserve(self, n):
+        """Make room for n more rows, doubling the capacity as needed"""
+        needed = self._size + n
+        capacity = self.capacity
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def append(self, n, **values):
+        """Append n rows; every column gets a sequence of length n or a scalar"""
+        if n <= 0:
+            return
+        self._reserve(n)
+        start, end = self._size, self._size + n
+        for name, column in self._columns.items():
+            column[start:end] = values[name]
+        self._size = end
+
+    def column(self, name):
+        """Read-only view of the filled part of a column"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def drain(self):
+        """Return copies of the filled columns and empty the store, keeping its capacity"""
+        data = {name: column[:self._size].copy() for name, column in self._columns.items()}
+        self._size = 0
+        return data
+
+    def nbytes(self):
+        return sum(column[:self._size].nbytes for column in self._columns.values())
+
+    def to_dataframe(self):
+        return pd.DataFrame({name: column[:self._size].copy() for name, column in self._columns.items()})
@@ -0,0 +1,162 @@
+import numpy as np
+
+from .order_status import OrderStatus
+
+_STATUSES = {status.value: status for status in OrderStatus}
+
+
+def _item(value):
+    return value.item()
+
+
+def status_from_value(value):
+    """Convert a status column value back to its OrderStatus"""
+    return _STATUSES[int(value)]
+
+
+class CustomerEngine:
+    """
+    Struct-of-arrays state of the customers in the restaurant.
+
+    Every customer owns one row in a set of NumPy columns (order_minute,
+    dining_duration, status, waiting_time, satisfaction, bill), so the per-step
+    update of all customers is a handful of vectorized operations instead of one
+    `step` call per agent. Rows are kept dense: removing a customer moves the last
+    row into its place. `ArrayCustomerAgent` objects stay in the model as a thin
+    view on their row for the code that works with agents (waiters, kitchen,
+    reporters); once a customer leaves, its values are copied back onto the agent.
+    """
+
+    COLUMNS = {
+        "order_minute": np.int32,
+        "dining_duration": np.int32,
+        "status": np.int8,
+        "waiting_time": np.int64,
+        "satisfaction": np.float64,
+        "bill": np.float64,
+    }
+
+    def __init__(self, capacity=256):
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self._agents = []
+
+    def __len__(self):
+        return len(self._agents)
+
+    def column(self, name):
+        """View of the filled part of a column"""
+        return self._columns[name][:len(self._agents)]
+
+    def add(self, agent, order_minute=0):
+        """Give an agent a row with the defaults of a newly arrived customer"""
+        row = len(self._agents)
+        if row == len(self._columns["status"]):
+            for name, column in self._columns.items():
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:row] = column
+                self._columns[name] = grown
+        columns = self._columns
+        columns["order_minute"][row] = order_minute
+        columns["dining_duration"][row] = 0
+        columns["status"][row] = OrderStatus.ORDERED.value
+        columns["waiting_time"][row] = agent._waiting_time
+        columns["satisfaction"][row] = agent._satisfaction
+        columns["bill"][row] = 0
+        self._agents.append(agent)
+        agent._engine, agent._row = self, row
+
+    def remove(self, agent):
+        """Detach an agent, copying its row back onto it, and fill the gap with the last row"""
+        row = agent._row
+        for field in EngineField.fields:
+            field.detach(agent, row)
+        agent._engine, agent._row = None, None
+
+        last = len(self._agents) - 1
+        if row != last:
+            for column in self._columns.values():
+                column[row] = column[last]
+            moved = self._agents[last]
+            self._agents[row] = moved
+            moved._row = row
+        self._agents.pop()
+
+    def update(self, current_minute):
+        """
+        Update waiting time and satisfaction of all customers not served yet.
+
+        Returns:
+        (unpaid, paying): Boolean masks over the rows of the customers who give up
+        waiting and of the served customers who have finished dining.
+        """
+        n = len(self._agents)
+        elapsed = current_minute - self._columns["order_minute"][:n]
+        waiting = self._columns["status"][:n] != OrderStatus.SERVED.value
+        np.copyto(self._columns["waiting_time"][:n], elapsed, where=waiting)
+        np.copyto(self._columns["satisfaction"][:n], np.maximum(0, 100 - elapsed * 2), where=waiting)
+        done = elapsed >= self._columns["dining_duration"][:n]
+        return waiting & done, ~waiting & done
+
+    def refresh(self, model):
+        """update() at the model's current minute, keeping the model's running totals in sync"""
+        n = len(self._agents)
+        waiting_before = int(self._columns["waiting_time"][:n].sum())
+        satisfaction_before = float(self._columns["satisfaction"][:n].sum())
+        unpaid, paying = self.update(model.current_minute)
+        model.total_waiting_time += int(self._columns["waiting_time"][:n].sum()) - waiting_before
+        model.total_satisfaction += float(self._columns["satisfaction"][:n].sum()) - satisfaction_before
+        return unpaid, paying
+
+    def step(self, model):
+        """Vectorized equivalent of calling step() on every customer"""
+        if not len(self._agents):
+            return
+        unpaid, paying = self.refresh(model)
+
+        # Resolve the rows to agents first, leaving reorders the rows
+        leaving_unpaid = [self._agents[i] for i in np.flatnonzero(unpaid)]
+        leaving_paid = [self._agents[i] for i in np.flatnonzero(paying)]
+        for customer in leaving_unpaid:
+            customer.leave_without_paying()
+        for customer in leaving_paid:
+            customer.leave_restaurant()
+
+
+class EngineField:
+    """
+    Attribute of an `ArrayCustomerAgent` that lives in a CustomerEngine column while
+    the customer is in the restaurant and on the agent itself before and after.
+
+    With `total` set, changes are also added to that running total on the model.
+    """
+
+    fields = []
+
+    def __init__(self, column, total=None, to_python=None):
+        self.column = column
+        self.total = total
+        self.to_python = to_python or _item
+        EngineField.fields.append(self)
+
+    def __set_name__(self, owner, name):
+        self.attr = "_" + name
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        if agent._row is None:
+            return getattr(agent, self.attr)
+        return self.to_python(agent._engine._columns[self.column][agent._row])
+
+    def __set__(self, agent, value):
+        if agent._row is None:
+            setattr(agent, self.attr, value)
+            return
+        column = agent._engine._columns[self.column]
+        if self.total is not None:
+            model = agent.model
+            setattr(model, self.total, getattr(model, self.total) + value - self.to_python(column[agent._row]))
+        column[agent._row] = getattr(value, "value", value)
+
+    def detach(self, agent, row):
+        setattr(agent, self.attr, self.to_python(agent._engine._columns[self.column][row]))
@@ -0,0 +1,123 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .order_status import OrderStatus
+
+# Cost of pairs that must not be matched, e.g. food a customer did not order; matches
+# costing more than _MAX_COST are discarded after solving
+_FORBIDDEN = 1e9
+_MAX_COST = _FORBIDDEN / 2
+
+
+class Dispatcher:
+    """
+    Central per-step assignment of food to waiters, replacing the waiters' own greedy choices.
+
+    Runs once per step before the waiters act and solves two batched assignment
+    problems with `scipy.optimize.linear_sum_assignment`, all costs in minutes:
+
+    - Leftover food (carried items whose customer left) x unassigned waiting customers
+      who ordered that food: walking time from the waiter to the customer minus the
+      customer's waiting time.
+    - Prepared orders x the free slots of the empty-handed waiters at the kitchen. Each
+      waiter first gets one order (walking time from the kitchen minus waiting time);
+      its other slots are then filled with orders close to that first delivery, so the
+      waiters split the restaurant between them instead of crossing each other.
+
+    Walking times come from the grid's cached walkway distance fields, at
+    `moves_per_step` moves (WaiterAgent.move) per model time step.
+    """
+
+    def __init__(self, moves_per_step=8):
+        self.moves_per_step = moves_per_step
+
+    def step(self, model):
+        self.reassign_leftovers(model)
+        self.assign_pickups(model)
+
+    def _minutes(self, model, moves):
+        return moves * model.time_step / self.moves_per_step
+
+    def reassign_leftovers(self, model):
+        """Match carried food without a customer to waiting customers who ordered it"""
+        items = [(waiter, i, order) for waiter in model.waiters
+                 for i, (customer, order) in enumerate(waiter.carrying_food) if customer is None]
+        if not items:
+            return
+        foods = {order for _, _, order in items}
+        customers = [customer for food in foods for customer in model.waiting_customers(food)
+                     if customer.pos is not None]
+        if not customers:
+            return
+
+        grid = model.grid
+        cost = np.full((len(items), len(customers)), _FORBIDDEN)
+        for c, customer in enumerate(customers):
+            for r, (waiter, _, order) in enumerate(items):
+                if order != customer.food_preference:
+                    continue
+                moves = grid.walking_distance(waiter.pos, customer.pos)
+                if moves >= 0:
+                    cost[r, c] = self._minutes(model, moves) - customer.waiting_time
+
+        for r, c in zip(*linear_sum_assignment(cost)):
+            if cost[r, c] > _MAX_COST:
+                continue
+            waiter, i, order = items[r]
+            customer = customers[c]
+            waiter.set_carried(i, customer, order)
+            model.assign_waiter(customer, waiter)
+            model.events.debug("waiter", "Dispatcher assigned %s carried by waiter %s to customer %s",
+                               order, waiter.unique_id, customer.unique_id)
+
+    def assign_pickups(self, model):
+        """Hand the prepared orders to the empty-handed waiters at the kitchen"""
+        kitchen = model.kitchen
+        waiters = [waiter for waiter in model.waiters
+                   if waiter.pos == kitchen.pos and not waiter.carrying_food]
+        orders = kitchen.prepared_orders.items()
+        if not waiters or not orders:
+            return
+
+        grid = model.grid
+        now = model.current_minute
+        waiting = np.array([now - customer.order_minute for customer, _ in orders], dtype=float)
+        tables = [customer.pos for customer, _ in orders]
+
+        def travel(source, table):
+            # Food for customers without a table (e.g. who already left) is free to take along
+            if table is None:
+                return 0.0
+            moves = grid.paths.between(source, table)
+            return self._minutes(model, moves) if moves >= 0 else _FORBIDDEN
+
+        # First order per waiter; all of them start at the kitchen
+        first = np.array([travel(kitchen.pos, table) for table in tables]) - waiting
+        rows, cols = linear_sum_assignment(np.tile(first, (len(waiters), 1)))
+        loads = {waiters[r]: [c] for r, c in zip(rows, cols) if first[c] <= _MAX_COST}
+
+        # Remaining slots, close to each waiter's first delivery
+        taken = {load[0] for load in loads.values()}
+        remaining = [c for c in range(len(orders)) if c not in taken]
+        slots = [waiter for waiter, load in loads.items() for _ in range(waiter.max_carry - len(load))]
+        if remaining and slots:
+            cost = np.empty((len(slots), len(remaining)))
+            anchors = {waiter: tables[load[0]] or kitchen.pos for waiter, load in loads.items()}
+            for r, waiter in enumerate(slots):
+                for j, c in enumerate(remaining):
+                    cost[r, j] = travel(anchors[waiter], tables[c]) - waiting[c]
+            for r, j in zip(*linear_sum_assignment(cost)):
+                if cost[r, j] <= _MAX_COST:
+                    loads[slots[r]].append(remaining[j])
+
+        for waiter, load in loads.items():
+            for c in load:
+                customer, order = orders[c]
+                kitchen.prepared_orders.remove(customer)
+                if customer.order_status == OrderStatus.ORDERED:
+                    customer.order_status = OrderStatus.DELIVERING
+                    model.assign_waiter(customer, waiter)
+                waiter.carry(customer, order)
+            # Let the waiter pick its first target from the new load
+            waiter.target_pos = None
+            model.events.debug("waiter", "Dispatcher gave waiter %s %d orders", waiter.unique_id, len(load))
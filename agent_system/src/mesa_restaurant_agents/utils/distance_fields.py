@@ -0,0 +1,160 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Shared by all models in a process, least recently used first:
+# {(width, height, kitchen_pos, torus): DistanceFields}
+_LAYOUT_CACHE = OrderedDict()
+_MAX_LAYOUTS = 4
+
+
+class DistanceFields:
+    """
+    BFS distance fields and next-hop tables over the walkable cells of a layout.
+
+    A field for a target holds, for every walkable cell, the number of (Moore)
+    moves to the nearest goal cell and the neighbouring cell one move closer.
+    The goal of a walkable target is the target itself; the goals of a table are
+    the walkable cells around it, where a waiter can serve it. The kitchen field
+    is built up front, other fields on first use, keeping the most recently used
+    ones up to `max_fields` fields or `max_bytes` bytes, whichever is reached first.
+    """
+
+    def __init__(self, width, height, walkable, torus=True, kitchen_pos=None, max_fields=1024,
+                 max_bytes=32 * 2**20):
+        self.width = width
+        self.height = height
+        self.torus = torus
+        self.walkable = np.asarray(walkable, dtype=bool)
+        # A field is two int32 arrays over all cells
+        self.max_fields = max(1, min(max_fields, max_bytes // (8 * width * height)))
+        self._fields = OrderedDict()
+        self._serving_cells = {}
+
+        # (8, cells) array with the walkable Moore neighbours of every cell by flat index
+        # x * height + y, -1 where the neighbour is off the grid or not walkable
+        cells = np.arange(width * height)
+        x, y = np.divmod(cells, height)
+        walkable_flat = self.walkable.ravel()
+        neighbors = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == 0 and dy == 0:
+                    continue
+                nx, ny = x + dx, y + dy
+                if torus:
+                    nx, ny = nx % width, ny % height
+                    valid = np.ones(len(cells), dtype=bool)
+                else:
+                    valid = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+                neighbor = np.where(valid, nx * height + ny, 0)
+                valid &= walkable_flat[neighbor] & (neighbor != cells)
+                neighbors.append(np.where(valid, neighbor, -1))
+        self._neighbors = np.stack(neighbors)
+
+        if kitchen_pos is not None:
+            self.field(kitchen_pos)
+
+    @classmethod
+    def for_layout(cls, width, height, kitchen_pos, walkable, torus=True):
+        """Fields shared by every grid with the same dimensions and kitchen"""
+        key = (width, height, tuple(kitchen_pos), torus)
+        fields = _LAYOUT_CACHE.get(key)
+        if fields is None:
+            fields = _LAYOUT_CACHE[key] = cls(width, height, walkable, torus, kitchen_pos)
+            if len(_LAYOUT_CACHE) > _MAX_LAYOUTS:
+                _LAYOUT_CACHE.popitem(last=False)
+        else:
+            _LAYOUT_CACHE.move_to_end(key)
+        return fields
+
+    @staticmethod
+    def clear_layout_cache():
+        """Drop the fields shared between grids, e.g. in a sweep worker between layouts"""
+        _LAYOUT_CACHE.clear()
+
+    def nbytes(self):
+        return sum(distance.nbytes + next_hop.nbytes for distance, next_hop in self._fields.values())
+
+    def _index(self, pos):
+        return pos[0] * self.height + pos[1]
+
+    def _pos(self, index):
+        return divmod(index, self.height)
+
+    def _moore(self, pos):
+        x, y = pos
+        cells = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == 0 and dy == 0:
+                    continue
+                nx, ny = x + dx, y + dy
+                if self.torus:
+                    nx, ny = nx % self.width, ny % self.height
+                elif not (0 <= nx < self.width and 0 <= ny < self.height):
+                    continue
+                if (nx, ny) != pos and (nx, ny) not in cells:
+                    cells.append((nx, ny))
+        return cells
+
+    def serving_cells(self, target):
+        """Walkable cells next to target, from where a waiter can serve it"""
+        cells = self._serving_cells.get(target)
+        if cells is None:
+            cells = self._serving_cells[target] = frozenset(pos for pos in self._moore(target) if self.walkable[pos])
+        return cells
+
+    def goals(self, target):
+        """Cells a walker has to reach to be at (or, for a table, next to) target"""
+        target = tuple(target)
+        if self.walkable[target]:
+            return [target]
+        return list(self.serving_cells(target))
+
+    def field(self, target):
+        """(distance, next_hop) arrays over flat cell indices for target; -1 where unreachable"""
+        target = tuple(target)
+        field = self._fields.get(target)
+        if field is not None:
+            self._fields.move_to_end(target)
+            return field
+
+        # Breadth-first search one frontier at a time; a newly reached cell's next hop is
+        # the first frontier cell (in neighbour order) it was reached from
+        size = self.width * self.height
+        distance = np.full(size, -1, dtype=np.int32)
+        next_hop = np.full(size, -1, dtype=np.int32)
+        frontier = np.array([self._index(pos) for pos in self.goals(target)], dtype=np.int64)
+        distance[frontier] = 0
+        d = 0
+        while frontier.size:
+            d += 1
+            reached = self._neighbors[:, frontier].ravel()
+            sources = np.broadcast_to(frontier, (len(self._neighbors), len(frontier))).ravel()
+            new = reached >= 0
+            new[new] = distance[reached[new]] < 0
+            frontier, first = np.unique(reached[new], return_index=True)
+            distance[frontier] = d
+            next_hop[frontier] = sources[new][first]
+
+        field = (distance, next_hop)
+        self._fields[target] = field
+        if len(self._fields) > self.max_fields:
+            self._fields.popitem(last=False)
+        return field
+
+    def distance(self, pos, target):
+        """Number of moves from pos to target, or -1 if it cannot be reached"""
+        return int(self.field(target)[0][self._index(pos)])
+
+    def between(self, source, target):
+        """Number of moves from a goal cell of source (e.g. next to a table) to target, -1 if unreachable"""
+        distances = self.field(target)[0][[self._index(pos) for pos in self.goals(source)]]
+        distances = distances[distances >= 0]
+        return int(distances.min()) if len(distances) else -1
+
+    def next_hop(self, pos, target):
+        """Next cell on a shortest path from pos to target, or None when there or unreachable"""
+        index = int(self.field(target)[1][self._index(pos)])
+        return self._pos(index) if index >= 0 else None
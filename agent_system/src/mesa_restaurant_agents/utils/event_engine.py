@@ -0,0 +1,146 @@
+import heapq
+import math
+from enum import Enum
+from itertools import count
+
+
+class Event(Enum):
+    ARRIVAL = 1           # A customer arrives (payload: index in the model's day_arrivals)
+    ORDER_READY = 2       # An order is done cooking
+    WAITER_ARRIVAL = 3    # A walking waiter reaches its target (payload (waiter, walk))
+    CUSTOMER_TIMEOUT = 4  # A customer gives up waiting unless served by then
+    MEAL_FINISHED = 5     # A served customer pays and leaves
+
+
+class EventEngine:
+    """
+    Discrete-event time advance for a RestaurantModel.
+
+    Instead of visiting every agent every time step, the model keeps a priority
+    queue of (minute, seq, event, payload) entries and jumps from one event to
+    the next: customer arrivals (from the model's ArrivalSchedule), orders becoming
+    ready, waiters reaching their target, customers giving up and customers
+    finishing their meal. Nothing is visited while a customer dines, an
+    order cooks or a waiter walks, so quiet periods cost almost nothing.
+
+    Event times are whole minutes. A waiter walks `cells_per_step` cells per model
+    time step and is only placed on its target cell when it arrives. Waiters without
+    a walk in progress are idle and act again on the next arrival, ready order or
+    departure. The model still samples its reporters once per time step.
+    """
+
+    def __init__(self, cells_per_step=8):
+        self.cells_per_step = cells_per_step
+        self._queue = []
+        self._seq = count()
+        self._walking = {}  # {waiter: seq of its current walk}
+        self._waiting = {}  # customers not served yet, in arrival order
+
+    def schedule(self, minute, event, payload=None):
+        heapq.heappush(self._queue, (minute, next(self._seq), event, payload))
+
+    def start_day(self, model):
+        """Drop the events of the previous day and schedule the first arrival of the day"""
+        self._queue.clear()
+        self._walking.clear()
+        self._waiting.clear()
+        self._schedule_arrival(model, 0)
+
+    def run_until(self, model, minute):
+        """Process all events up to and including minute, in time order, leaving the model at minute"""
+        queue = self._queue
+        while queue and queue[0][0] <= minute:
+            model.current_minute, _, event, payload = heapq.heappop(queue)
+            self._HANDLERS[event](self, model, payload)
+        model.current_minute = minute
+        self.refresh_customers(model)
+
+    def refresh_customers(self, model):
+        """Bring waiting time and satisfaction of the customers not served yet up to date"""
+        if model.customer_engine is not None:
+            model.customer_engine.refresh(model)
+            return
+        now = model.current_minute
+        for customer in self._waiting:
+            customer.waiting_time = now - customer.order_minute
+            customer.satisfaction = max(0, 100 - (customer.waiting_time * 2))
+
+    def customer_served(self, customer):
+        """A waiter served customer: they leave once their dining duration is over"""
+        if customer in self._waiting:
+            del self._waiting[customer]
+            self.schedule(customer.order_minute + customer.dining_duration, Event.MEAL_FINISHED, customer)
+
+    def activate_idle(self, model):
+        """Let every waiter that is not walking act, in random order"""
+        idle = [waiter for waiter in model.waiters if waiter not in self._walking]
+        model.random.shuffle(idle)
+        for waiter in idle:
+            self._activate(model, waiter)
+
+    def _activate(self, model, waiter):
+        # The waiter serves or picks up food where it stands and picks its next target ...
+        waiter.step()
+        waiter.prepare_move()
+        if waiter.target_pos is None:
+            return
+        # ... which it reaches after walking the shortest path at cells_per_step per time step
+        distance = model.grid.walking_distance(waiter.pos, waiter.target_pos)
+        if distance <= 0:
+            return
+        walk = next(self._seq)
+        self._walking[waiter] = walk
+        minutes = max(1, math.ceil(distance * model.time_step / self.cells_per_step))
+        self.schedule(model.current_minute + minutes, Event.WAITER_ARRIVAL, (waiter, walk))
+
+    def _schedule_arrival(self, model, i):
+        # Only the next arrival of the day is queued at a time
+        arrivals = model.day_arrivals
+        if i < len(arrivals):
+            self.schedule(int(arrivals.minutes[i]), Event.ARRIVAL, i)
+
+    def _on_arrival(self, model, i):
+        food_preference, dining_duration, table_draw = model.day_arrivals[i]
+        customer = model.add_customer(food_preference=food_preference, dining_duration=dining_duration,
+                                      table_draw=table_draw)
+        self._waiting[customer] = None
+        self.schedule(customer.order_minute + model.kitchen.prep_time, Event.ORDER_READY)
+        self.schedule(customer.order_minute + customer.dining_duration, Event.CUSTOMER_TIMEOUT, customer)
+        self._schedule_arrival(model, i + 1)
+        self.activate_idle(model)
+
+    def _on_order_ready(self, model, payload):
+        model.kitchen.add_ready_orders_to_prepared(model.current_minute)
+        self.activate_idle(model)
+
+    def _on_waiter_arrival(self, model, payload):
+        waiter, walk = payload
+        if self._walking.get(waiter) != walk:
+            return
+        del self._walking[waiter]
+        if waiter not in model.waiters:
+            return
+        waiter.move(steps=max(0, model.grid.walking_distance(waiter.pos, waiter.target_pos)))
+        self._activate(model, waiter)
+
+    def _on_customer_timeout(self, model, customer):
+        if customer not in self._waiting or not model.has_customer(customer):
+            return
+        del self._waiting[customer]
+        customer.waiting_time = model.current_minute - customer.order_minute
+        customer.satisfaction = max(0, 100 - (customer.waiting_time * 2))
+        customer.leave_without_paying()
+        self.activate_idle(model)
+
+    def _on_meal_finished(self, model, customer):
+        if model.has_customer(customer):
+            customer.leave_restaurant()
+            self.activate_idle(model)
+
+    _HANDLERS = {
+        Event.ARRIVAL: _on_arrival,
+        Event.ORDER_READY: _on_order_ready,
+        Event.WAITER_ARRIVAL: _on_waiter_arrival,
+        Event.CUSTOMER_TIMEOUT: _on_customer_timeout,
+        Event.MEAL_FINISHED: _on_meal_finished,
+    }
@@ -0,0 +1,92 @@
+import logging
+from collections import deque
+from typing import NamedTuple
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+
+# Event categories and the logger each one is routed to
+CATEGORIES = ("model", "waiter", "kitchen", "schedule")
+LOGGER_PREFIX = "mesa_restaurant_agents"
+
+
+class Event(NamedTuple):
+    """A recorded simulation event, formatted only when its message is read"""
+    day: int
+    minute: int
+    category: str
+    level: int
+    msg: str
+    args: tuple
+
+    @property
+    def message(self):
+        return self.msg % self.args if self.args else self.msg
+
+
+class EventLog:
+    """
+    Leveled, per-category event log for the restaurant simulation.
+
+    Every category has its own threshold. Events below the threshold return before
+    anything is formatted, so switched-off logging costs one comparison per call.
+    Messages use %-style placeholders with separate arguments (like the logging
+    module) and call sites with expensive arguments should check `enabled` first.
+
+    Events that pass the threshold are forwarded to the
+    `mesa_restaurant_agents.<category>` logger, so what is displayed is configured
+    with the standard logging module (e.g. `logging.basicConfig(level=logging.INFO)`).
+    With `buffer_size > 0` they are additionally kept in a ring buffer of recent
+    events for debugging.
+    """
+
+    def __init__(self, model=None, level=WARNING, categories=None, buffer_size=0):
+        self.model = model
+        self._thresholds = dict.fromkeys(CATEGORIES, level)
+        if categories:
+            self._thresholds.update(categories)
+        self._loggers = {category: logging.getLogger(f"{LOGGER_PREFIX}.{category}")
+                         for category in self._thresholds}
+        self.buffer = deque(maxlen=buffer_size) if buffer_size else None
+
+    def set_level(self, level, category=None):
+        """Set the threshold of one category, or of all categories if none is given"""
+        if category is None:
+            for name in self._thresholds:
+                self._thresholds[name] = level
+        else:
+            self._thresholds[category] = level
+            if category not in self._loggers:
+                self._loggers[category] = logging.getLogger(f"{LOGGER_PREFIX}.{category}")
+
+    def enabled(self, category, level=DEBUG):
+        """Check whether events of this category and level are recorded"""
+        return level >= self._thresholds.get(category, WARNING)
+
+    def log(self, category, level, msg, *args):
+        """Record an event if its category is switched on for this level"""
+        if level < self._thresholds.get(category, WARNING):
+            return
+        if self.buffer is not None:
+            model = self.model
+            self.buffer.append(Event(getattr(model, 'current_day', 0), getattr(model, 'current_minute', 0),
+                                     category, level, msg, args))
+        logger = self._loggers.get(category) or logging.getLogger(f"{LOGGER_PREFIX}.{category}")
+        logger.log(level, msg, *args)
+
+    def debug(self, category, msg, *args):
+        self.log(category, DEBUG, msg, *args)
+
+    def info(self, category, msg, *args):
+        self.log(category, INFO, msg, *args)
+
+    def warning(self, category, msg, *args):
+        self.log(category, WARNING, msg, *args)
+
+    def recent(self, n=None, category=None):
+        """Return the most recent buffered events, oldest first"""
+        if self.buffer is None:
+            return []
+        events = [e for e in self.buffer if category is None or e.category == category]
+        return events if n is None else events[-n:]
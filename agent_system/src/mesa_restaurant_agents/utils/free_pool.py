@@ -0,0 +1,45 @@
+class FreePool:
+    """
+    Set of free positions supporting O(1) add, discard and uniform random choice.
+
+    Positions are kept in a list with an index map; discarding moves the last
+    position into the freed slot (swap-remove), so the list never has holes and
+    `choice` is a single index into it.
+    """
+
+    def __init__(self, positions=()):
+        self._items = []
+        self._index = {}
+        for pos in positions:
+            self.add(pos)
+
+    def add(self, pos):
+        if pos not in self._index:
+            self._index[pos] = len(self._items)
+            self._items.append(pos)
+
+    def discard(self, pos):
+        i = self._index.pop(pos, None)
+        if i is None:
+            return
+        last = self._items.pop()
+        if i < len(self._items):
+            self._items[i] = last
+            self._index[last] = i
+
+    def choice(self, random):
+        """Uniformly random free position drawn with the given random.Random"""
+        return self._items[random.randrange(len(self._items))]
+
+    def pick(self, draw):
+        """Free position for a uniform draw in [0, 1), e.g. pre-drawn in bulk"""
+        return self._items[int(draw * len(self._items))]
+
+    def __contains__(self, pos):
+        return pos in self._index
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
@@ -0,0 +1,185 @@
+import bisect
+
+import numpy as np
+
+from .column_store import ColumnStore
+from .results_sink import ResultsRun
+
+
+class GridTrajectory:
+    """
+    Delta-encoded replacement for the per-step GridState reporter.
+
+    The static layout (kitchen and tables) is recorded once per run. For the agents
+    only changes are stored: every collection appends one row per agent that arrived,
+    moved or departed since the previous collection, with int16 coordinates
+    (departures are stored as (-1, -1)). Keyframes of the agent positions are kept
+    every `keyframe_interval` collections so `state_at` only has to replay the
+    changes since the closest keyframe.
+
+    With a ResultsSink the changes are written to it in chunks of `sink.chunk_rows`
+    events; `state_at` then reads the part already written back from the run directory.
+    """
+
+    DEPARTED = -1
+
+    EVENT_COLUMNS = {
+        "step": np.int32,
+        "slot": np.int32,       # Per-run agent key; unique_id is not unique across agent types
+        "agent_id": np.int32,
+        "agent_type": np.int8,
+        "x": np.int16,
+        "y": np.int16,
+    }
+
+    SINK_TABLES = {"events": "grid_events", "steps": "grid_steps"}
+
+    def __init__(self, keyframe_interval=144, sink=None):
+        self.sink = sink
+        self.layout = []
+        self.agent_types = []
+        self.keyframe_interval = keyframe_interval
+        self.events = ColumnStore(self.EVENT_COLUMNS)
+        self.steps = ColumnStore({"step": np.int32}, capacity=256)
+        self._type_codes = {}
+        self._slots = {}           # agent -> slot
+        self._next_slot = 0
+        self._last_pos = {}        # agent -> last recorded position
+        self._keyframes = []       # (step, number of events, {slot: (agent_id, type code, pos)})
+        self._state = {}           # current {slot: (agent_id, type code, pos)}
+        self._flushed = {"events": 0, "steps": 0}  # rows already written to the sink
+
+    def record_layout(self, model):
+        """Record the static cells of the restaurant once per run"""
+        self.layout = [{'pos': model.kitchen.pos, 'type': 'Kitchen'}]
+        self.layout.extend({'pos': table_pos, 'type': 'Table'} for table_pos in model.grid.layout['tables'])
+        if self.sink is not None:
+            self.sink.set_attr("grid_layout", self.layout)
+
+    def _type_code(self, agent):
+        name = type(agent).__name__
+        code = self._type_codes.get(name)
+        if code is None:
+            code = self._type_codes[name] = len(self.agent_types)
+            self.agent_types.append(name)
+        return code
+
+    def _slot(self, agent):
+        slot = self._slots.get(agent)
+        if slot is None:
+            slot = self._slots[agent] = self._next_slot
+            self._next_slot += 1
+        return slot
+
+    def collect(self, model):
+        """Append the arrivals, moves and departures since the previous collection"""
+        step = model.steps
+        last_pos = self._last_pos
+        seen = set()
+        rows = []
+
+        for agent in model.agents:
+            pos = agent.pos
+            if pos is None:
+                continue
+            seen.add(agent)
+            if last_pos.get(agent) != pos:
+                last_pos[agent] = pos
+                rows.append((self._slot(agent), agent.unique_id, self._type_code(agent), pos[0], pos[1]))
+
+        for agent in [agent for agent in last_pos if agent not in seen]:
+            del last_pos[agent]
+            slot = self._slots.pop(agent)
+            rows.append((slot, agent.unique_id, self._type_code(agent), self.DEPARTED, self.DEPARTED))
+
+        if rows:
+            slots, ids, types, xs, ys = zip(*rows)
+            self.events.append(len(rows), step=step, slot=slots, agent_id=ids, agent_type=types, x=xs, y=ys)
+            self._apply(self._state, rows)
+
+        n_steps = self._flushed["steps"] + len(self.steps)
+        if n_steps % self.keyframe_interval == 0:
+            self._keyframes.append((step, self._flushed["events"] + len(self.events), dict(self._state)))
+        self.steps.append(1, step=step)
+
+        if self.sink is not None and len(self.events) >= self.sink.chunk_rows:
+            self.flush()
+
+    @classmethod
+    def _apply(cls, state, rows):
+        for slot, agent_id, type_code, x, y in rows:
+            if x == cls.DEPARTED:
+                state.pop(slot, None)
+            else:
+                state[slot] = (agent_id, type_code, (x, y))
+
+    def _column(self, attr, name, start=0):
+        """Rows start.. of a column, read from the sink for the part already written to it"""
+        flushed = self._flushed[attr]
+        in_memory = getattr(self, attr).column(name)
+        if start >= flushed:
+            return in_memory[start - flushed:]
+        written = ResultsRun(self.sink.path).column(name, self.SINK_TABLES[attr])
+        return np.concatenate([written[start:flushed], in_memory])
+
+    def collected_steps(self):
+        """The model steps at which the trajectory was collected"""
+        return self._column("steps", "step")
+
+    def positions_at(self, step):
+        """Agent positions as {slot: (agent_id, type code, pos)} at a collected step"""
+        if not self._keyframes or step < self._keyframes[0][0]:
+            raise KeyError(f"No grid state collected for step {step}")
+        index = bisect.bisect_right([keyframe[0] for keyframe in self._keyframes], step) - 1
+        _, start, keyframe_state = self._keyframes[index]
+        state = dict(keyframe_state)
+
+        end = int(np.searchsorted(self._column("events", "step", start), step, side="right"))
+        columns = [self._column("events", name, start)[:end].tolist() for name in ("slot", "agent_id", "agent_type", "x", "y")]
+        self._apply(state, zip(*columns))
+        return state
+
+    def state_at(self, step):
+        """Rebuild the full GridState (same format as RestaurantModel.get_grid_state) at a collected step"""
+        state = list(self.layout)
+        positions = self.positions_at(step)
+        for slot in sorted(positions):
+            agent_id, type_code, pos = positions[slot]
+            state.append({'pos': pos, 'type': self.agent_types[type_code], 'nr': agent_id})
+        return state
+
+    def flush(self):
+        """Move the changes held in memory to the sink"""
+        if self.sink is None:
+            return
+        self.sink.set_attr("grid_agent_types", self.agent_types)
+        for attr, table in self.SINK_TABLES.items():
+            store = getattr(self, attr)
+            self._flushed[attr] += len(store)
+            self.sink.append_columns(table, store.drain())
+
+    @classmethod
+    def load(cls, run, keyframe_interval=144):
+        """Rebuild an in-memory trajectory from a ResultsRun, replaying it to restore the keyframes"""
+        trajectory = cls(keyframe_interval)
+        trajectory.layout = [{'pos': tuple(cell['pos']), 'type': cell['type']} for cell in run.attrs["grid_layout"]]
+        trajectory.agent_types = list(run.attrs["grid_agent_types"])
+        events = {name: np.asarray(run.column(name, "grid_events")) for name in cls.EVENT_COLUMNS}
+        steps = np.asarray(run.column("step", "grid_steps"))
+        trajectory.events.append(len(events["step"]), **events)
+
+        state = {}
+        start = 0
+        for i, step in enumerate(steps.tolist()):
+            end = int(np.searchsorted(events["step"], step, side="right"))
+            cls._apply(state, zip(*[events[name][start:end].tolist() for name in ("slot", "agent_id", "agent_type", "x", "y")]))
+            start = end
+            if i % keyframe_interval == 0:
+                trajectory._keyframes.append((step, end, dict(state)))
+        trajectory.steps.append(len(steps), step=steps)
+        trajectory._state = state
+        return trajectory
+
+    def nbytes(self):
+        """Bytes of the changes held in memory"""
+        return self.events.nbytes() + self.steps.nbytes()
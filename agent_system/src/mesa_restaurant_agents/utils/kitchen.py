@@ -1,31 +1,123 @@
+import heapq
+from itertools import count
+
+
+class PreparedOrders:
+    """
+    Prepared orders by customer, with a pickup queue ordered by order minute.
+
+    Behaves like the {customer: order} dict it replaces; `take(n)` removes and
+    returns the n orders of the longest waiting customers in O(n log size).
+    Removed or replaced entries stay in the queue until they reach its front;
+    once they outnumber the live ones the queue is rebuilt without them.
+    """
+
+    def __init__(self):
+        self._orders = {}  # {customer: (order, seq)}
+        self._queue = []   # heap of (order_minute, seq, customer)
+        self._seq = count()
+        self._stale = 0    # queue entries whose order was removed or replaced
+
+    def add(self, customer, order, order_minute):
+        seq = next(self._seq)
+        if customer in self._orders:
+            self._stale += 1
+        self._orders[customer] = (order, seq)
+        heapq.heappush(self._queue, (order_minute, seq, customer))
+
+    def remove(self, customer):
+        """Remove and return the order of customer without going through the pickup queue"""
+        order, _ = self._orders.pop(customer)
+        self._stale += 1
+        if self._stale > len(self._orders):
+            self._compact()
+        return order
+
+    def _compact(self):
+        orders = self._orders
+        self._queue = [entry for entry in self._queue
+                       if entry[2] in orders and orders[entry[2]][1] == entry[1]]
+        heapq.heapify(self._queue)
+        self._stale = 0
+
+    def take(self, n):
+        """Remove and return up to n (customer, order) pairs, longest waiting customers first"""
+        taken = []
+        queue = self._queue
+        while queue and len(taken) < n:
+            _, seq, customer = heapq.heappop(queue)
+            entry = self._orders.get(customer)
+            if entry is not None and entry[1] == seq:
+                del self._orders[customer]
+                taken.append((customer, entry[0]))
+            else:
+                self._stale -= 1
+        return taken
+
+    def __setitem__(self, customer, order):
+        self.add(customer, order, getattr(customer, 'order_minute', 0))
+
+    def __getitem__(self, customer):
+        return self._orders[customer][0]
+
+    def __delitem__(self, customer):
+        self.remove(customer)
+
+    def __contains__(self, customer):
+        return customer in self._orders
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __iter__(self):
+        return iter(self._orders)
+
+    def items(self):
+        return [(customer, order) for customer, (order, _) in self._orders.items()]
+
+    def clear(self):
+        self._orders.clear()
+        self._queue.clear()
+        self._stale = 0
+
+
 class Kitchen:
-    
+
     def __init__(self, pos):
         self.pos = pos
-        self.prepared_orders = {}   # dict {customer:order}
+        self.prepared_orders = PreparedOrders()   # {customer: order}, picked up longest waiting first
         self.requested_orders = {}  # dict {customer: {"order": order, "order_time": ordered_time}}
         self.prep_time = 10  # Minutes needed to prepare an order
+        # Min-heap of (ready_minute, seq, customer, request) so a step only touches the orders that are due;
+        # seq keeps orders with the same ready minute in the order they were placed
+        self._cooking = []
+        self._seq = count()
 
     def add_new_customer_order(self, customer, order, order_minute):
         """Add new order to requested orders"""
-        self.requested_orders[customer] = {
+        request = {
             "order": order,
             "order_minute": order_minute
         }
+        self.requested_orders[customer] = request
+        heapq.heappush(self._cooking, (order_minute + self.prep_time, next(self._seq), customer, request))
 
     def add_ready_orders_to_prepared(self, current_minute):
         """Move orders that are ready to prepared orders"""
-        to_delete = []
-
-        for customer, value in self.requested_orders.items():
-            time_cooking = current_minute - value["order_minute"]
-            if time_cooking >= self.prep_time:
-                self.prepared_orders[customer] = value["order"]
-                to_delete.append(customer)
-
-        for customer in to_delete:
-            del self.requested_orders[customer]
+        cooking = self._cooking
+        while cooking and cooking[0][0] <= current_minute:
+            _, _, customer, request = heapq.heappop(cooking)
+            # Skip entries whose order was replaced or dropped in the meantime
+            if self.requested_orders.get(customer) is request:
+                self.prepared_orders.add(customer, request["order"], request["order_minute"])
+                del self.requested_orders[customer]
 
         #print(
         #    f"DEBUG: Kitchen processing - requested orders: "
         #    f"{len(self.requested_orders)}, prepared orders: {len(self.prepared_orders)}")
+
+    def clear(self):
+        """Drop all requested and prepared orders"""
+        self.requested_orders.clear()
+        self.prepared_orders.clear()
+        self._cooking.clear()
@@ -13,3 +13,11 @@ class OrderStatus(Enum):
     ORDERED = 1    # Order has been placed
     DELIVERING = 2  # Food is being delivered
     SERVED = 3     # Food has been delivered
+
+# States of a waiter's work cycle (see WaiterAgent.step)
+class WaiterState(Enum):
+    IDLE_AT_KITCHEN = 1  # At the kitchen with empty hands, waiting for prepared orders
+    TO_KITCHEN = 2       # Walking back to the kitchen
+    DELIVERING = 3       # Walking to the next customer on the route
+    SERVING = 4          # Next to the target customer's table
+    REASSIGNING = 5      # Carrying food whose customer left, looking for someone else who ordered it
@@ -2,14 +2,18 @@ import mesa
 from ..agents.customer_agent import CustomerAgent
 from ..agents.manager_agent import ManagerAgent
 from ..agents.waiter_agent import WaiterAgent
-import random
+from .distance_fields import DistanceFields
+from .free_pool import FreePool
+from random import Random
+import numpy as np
 
 Coordinate = tuple[int, int]
 
 class RestaurantGrid(mesa.space.MultiGrid):
 
-    def __init__(self, width, height, kitchen_pos):
+    def __init__(self, width, height, kitchen_pos, random=None):
         super().__init__(width, height, True)
+        self.random = random if random is not None else Random()
         self.layout = {
             'kitchen': kitchen_pos,
             'walkways': set(),
@@ -17,40 +21,36 @@ class RestaurantGrid(mesa.space.MultiGrid):
         }
 
         self._setup_restaurant_layout()
-        self._empties_workers = self.layout['walkways'].copy()  # Use copy to avoid reference issues
-        self._empties_customers = self.layout['tables'].copy()
+        # Free positions per agent type, sampled in O(1) with the model RNG
+        self._empties_workers = FreePool(self.layout['walkways'])
+        self._empties_customers = FreePool(self.layout['tables'])
+
+        # Shortest walkway paths, shared with every grid of the same layout
+        self.paths = DistanceFields.for_layout(self.width, self.height, self.layout['kitchen'],
+                                               self.walkable_mask, self.torus)
 
     def _setup_restaurant_layout(self):
         """Setup restaurant layout with walkways, tables, and kitchen"""
-        # First, create sets for all types
-        walkways = set()
-        tables = set()
-
         # Define kitchen position
         kitchen_x = (self.width // 2) + 2 if self.width % 2 == 1 else (self.width // 2) + 2
         kitchen_y = (self.height // 2) + 2 if self.height % 2 == 1 else (self.height // 2) + 2
         self.layout['kitchen'] = (kitchen_x, kitchen_y)
 
-        # Fill all positions
-        for y in range(self.height):
-            for x in range(self.width):
-                pos = (x, y)
-                # Skip kitchen position
-                if pos == self.layout['kitchen']:
-                    continue
-                # Place tables on odd coordinates
-                if x % 2 == 1 and y % 2 == 1:
-                    tables.add(pos)
-                # All other positions are walkways
-                else:
-                    walkways.add(pos)
-
-        # Update layout
-        self.layout['walkways'] = walkways
-        self.layout['tables'] = tables
+        # Static masks indexed [x, y]: tables on odd coordinates, the kitchen, all other positions are walkways
+        x, y = np.indices((self.width, self.height))
+        self.kitchen_mask = (x == kitchen_x) & (y == kitchen_y)
+        self.table_mask = (x % 2 == 1) & (y % 2 == 1) & ~self.kitchen_mask
+        self.walkway_mask = ~self.table_mask & ~self.kitchen_mask
+        self.walkable_mask = self.walkway_mask | self.kitchen_mask
+        # Tables currently taken by a customer
+        self.occupied_mask = np.zeros((self.width, self.height), dtype=bool)
+
+        # Sets of positions for the code working with coordinates, filled row by row
+        self.layout['walkways'] = self._positions(self.walkway_mask)
+        self.layout['tables'] = self._positions(self.table_mask)
 
         # Validate total cell count
-        total_cells = len(walkways) + len(tables) + 1  # +1 for kitchen
+        total_cells = len(self.layout['walkways']) + len(self.layout['tables']) + 1  # +1 for kitchen
         if total_cells != self.width * self.height:
             raise ValueError(f"Invalid cell count: {total_cells} vs {self.width * self.height}")
 
@@ -71,13 +71,23 @@ class RestaurantGrid(mesa.space.MultiGrid):
     #                row.append('E')
     #        print(' '.join(row))
 
-    def position_randomly(self, agent):
+    @staticmethod
+    def _positions(mask):
+        """Set of the (x, y) positions where mask is set"""
+        y, x = np.nonzero(mask.T)
+        return set(zip(x.tolist(), y.tolist()))
+
+    def position_randomly(self, agent, draw=None):
+        """Place agent on a random free cell; draw in [0, 1) picks a customer's table instead of self.random"""
         if isinstance(agent, CustomerAgent) and self._empties_customers:
-            pos = random.choice(list(self._empties_customers))
+            if draw is None:
+                pos = self._empties_customers.choice(self.random)
+            else:
+                pos = self._empties_customers.pick(draw)
             self.place_agent(agent=agent, pos=pos)
             return True
         elif (isinstance(agent, WaiterAgent) or isinstance(agent, ManagerAgent)) and self._empties_workers:
-            pos = random.choice(list(self._empties_workers))
+            pos = self._empties_workers.choice(self.random)
             self.place_agent(agent=agent, pos=pos)
             return True
         return False
@@ -94,6 +104,7 @@ class RestaurantGrid(mesa.space.MultiGrid):
                 self._empties.discard(pos)
             if isinstance(agent, CustomerAgent):
                 self._empties_customers.discard(pos)
+                self.occupied_mask[pos] = True
             else:
                 self._empties_workers.discard(pos)
             self._empty_mask[agent.pos] = True
@@ -110,19 +121,89 @@ class RestaurantGrid(mesa.space.MultiGrid):
             self._empties.add(pos)
         if isinstance(agent, CustomerAgent):
             self._empties_customers.add(pos)
+            self.occupied_mask[pos] = False
         else:
             self._empties_workers.add(pos)
         self._empty_mask[agent.pos] = False
         agent.pos = None
 
+    def next_hop(self, pos, target):
+        """Next cell on a shortest walkway path from pos to target (or to a cell next to a table target)"""
+        return self.paths.next_hop(pos, target)
+
+    def advance_along_paths(self, agents, steps=8):
+        """
+        Move every agent up to steps cells toward its target_pos along shortest walkway paths.
+
+        All agents hop through the stacked next-hop tables of their targets at once and only
+        their final cells are committed to the grid. Agents stop at their target, or next to
+        it for a table. Returns the total number of cells moved.
+        """
+        movers = [agent for agent in agents if agent.target_pos and agent.pos != agent.target_pos]
+        if not movers:
+            return 0
+        moved = np.zeros(len(movers), dtype=np.int64)
+
+        targets = list(dict.fromkeys(tuple(agent.target_pos) for agent in movers))
+        rows = {target: row for row, target in enumerate(targets)}
+        next_hop = np.stack([self.paths.field(target)[1] for target in targets])
+        row = np.array([rows[tuple(agent.target_pos)] for agent in movers])
+        cell = np.array([pos[0] * self.height + pos[1] for pos in (agent.pos for agent in movers)])
+        previous = cell.copy()
+
+        for _ in range(steps):
+            hop = next_hop[row, cell]
+            moving = hop >= 0
+            if not moving.any():
+                break
+            previous = np.where(moving, cell, previous)
+            cell = np.where(moving, hop, cell)
+            moved += moving
+
+        for agent, n, cell_index, previous_index in zip(movers, moved.tolist(), cell.tolist(), previous.tolist()):
+            if n:
+                agent.previous_pos = divmod(previous_index, self.height)
+                self.move_agent(agent, divmod(cell_index, self.height))
+        return int(moved.sum())
+
+    def walking_distance(self, pos, target):
+        """Number of moves from pos to target (or to a cell next to a table target), -1 if unreachable"""
+        return self.paths.distance(pos, target)
+
+    def serving_cells(self, table):
+        """Walkable cells next to a table, computed once per layout"""
+        return self.paths.serving_cells(table)
+
+    def can_serve_from(self, pos, table):
+        """Check in O(1) whether a waiter at pos is next to table"""
+        return pos in self.paths.serving_cells(table)
+
     def is_walkway(self, pos):
         """Check if a position is a walkway"""
-        return pos in self.layout['walkways']
+        return bool(self.walkway_mask[pos])
     
     def is_table(self, pos):
-        """Check if a position is a walkway"""
-        return pos in self.layout['tables']
+        """Check if a position is a table"""
+        return bool(self.table_mask[pos])
     
     def is_kitchen(self, pos):
-        """Check if a position is a walkway"""
+        """Check if a position is the kitchen"""
         return pos == self.layout['kitchen']
+
+    def is_walkable(self, pos):
+        """Check if a waiter can stand on a position (walkway or kitchen)"""
+        return bool(self.walkable_mask[pos])
+
+    def free_tables(self):
+        """(n, 2) array with the x, y coordinates of all tables without a customer"""
+        return np.argwhere(self.table_mask & ~self.occupied_mask)
+
+    def free_tables_within(self, radius, center=None):
+        """Free tables within a Manhattan distance of radius from center (the kitchen by default)"""
+        cx, cy = center if center is not None else self.layout['kitchen']
+        tables = self.free_tables()
+        return tables[np.abs(tables[:, 0] - cx) + np.abs(tables[:, 1] - cy) <= radius]
+
+    def count_occupied(self):
+        """Number of tables taken by a customer"""
+        return int(np.count_nonzero(self.occupied_mask))
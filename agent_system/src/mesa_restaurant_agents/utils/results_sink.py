@@ -0,0 +1,238 @@
+import json
+import os
+import shutil
+from numbers import Number
+
+import numpy as np
+import pandas as pd
+
+META_FILE = "meta.json"
+MODEL_TABLE = "model"
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, 'value'):  # Enums such as OrderStatus
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class ResultsSink:
+    """
+    Streams collected simulation data to a run directory while the model runs.
+
+    Data is organized in tables of equally long columns. Numeric columns are appended
+    as raw binary files (`<table>/<column>.bin`) that `ResultsRun` memory-maps;
+    other values (lists/dicts such as Customer_Info) go to JSON lines files with an
+    offset index (`<column>.jsonl` + `<column>.idx`) so single rows can be read
+    without loading the rest. Model reporter rows are buffered and written in
+    chunks of `chunk_rows`; `meta.json` is rewritten on every flush so a run can be
+    opened read-only while it is still being written.
+
+    All files are appended to, so the run directory has to be new or empty; with
+    `overwrite=True` an existing run in it is deleted first.
+    """
+
+    def __init__(self, path, chunk_rows=1024, params=None, overwrite=False):
+        self.path = os.fspath(path)
+        self.chunk_rows = chunk_rows
+        if os.path.isdir(self.path) and os.listdir(self.path):
+            if not overwrite:
+                raise FileExistsError(f"Run directory {self.path} is not empty; pass overwrite=True to replace it")
+            shutil.rmtree(self.path)
+        os.makedirs(self.path, exist_ok=True)
+        self.meta = {"params": params or {}, "tables": {}, "attrs": {}}
+        self._buffer = []
+        self._json_columns = set()
+        self._json_ends = {}
+        self._pending_nulls = {}  # model columns that were None in every row so far -> number of rows
+
+    def _table_meta(self, table):
+        return self.meta["tables"].setdefault(table, {"rows": 0, "columns": {}})
+
+    def _column_path(self, table, column, suffix):
+        directory = os.path.join(self.path, table)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{column}{suffix}")
+
+    def append_row(self, row):
+        """Buffer one model reporter row and write the buffer once it holds chunk_rows rows"""
+        # Non-numeric values are serialized right away, as the model may still mutate them
+        encoded = {}
+        for name, value in row.items():
+            if value is None or (isinstance(value, Number) and not isinstance(value, complex)):
+                encoded[name] = value
+            else:
+                self._json_columns.add(name)
+                encoded[name] = json.dumps(value, default=_json_default)
+        self._buffer.append(encoded)
+        if len(self._buffer) >= self.chunk_rows:
+            self.flush()
+
+    def append_columns(self, table, columns):
+        """Append equally long arrays to the numeric columns of a table"""
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError(f"Columns appended to {table} differ in length: {lengths}")
+        n = lengths.pop()
+        if not n:
+            return
+        table_meta = self._table_meta(table)
+        for name, values in columns.items():
+            values = np.ascontiguousarray(values)
+            dtype = table_meta["columns"].setdefault(name, {"kind": "array", "dtype": values.dtype.str})["dtype"]
+            with open(self._column_path(table, name, ".bin"), "ab") as fh:
+                values.astype(dtype, copy=False).tofile(fh)
+        table_meta["rows"] += n
+        self._write_meta()
+
+    def append_records(self, table, records):
+        """Append a list of flat dicts with numeric values to a table"""
+        if records:
+            self.append_columns(table, {name: np.array([record.get(name, np.nan) for record in records],
+                                                       dtype=np.float64)
+                                        for name in records[0]})
+
+    def set_attr(self, name, value):
+        """Store a small JSON-serializable value (e.g. a static layout) in the run metadata"""
+        self.meta["attrs"][name] = value
+        self._write_meta()
+
+    def flush(self):
+        """Write the buffered model reporter rows to disk"""
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        table_meta = self._table_meta(MODEL_TABLE)
+        columns = table_meta["columns"]
+        for name in rows[0]:
+            values = [row.get(name) for row in rows]
+            if name not in columns:
+                # The kind follows the first value that is not None; until then only the
+                # number of None rows is kept, and written as NaN/null once the kind is known
+                if name in self._json_columns:
+                    kind = "json"
+                elif any(value is not None for value in values):
+                    kind = "array"
+                else:
+                    self._pending_nulls[name] = self._pending_nulls.get(name, 0) + len(values)
+                    continue
+                self._add_model_column(name, kind)
+            self._append_model_values(name, values)
+        table_meta["rows"] += len(rows)
+        self._write_meta()
+
+    def _add_model_column(self, name, kind):
+        columns = self._table_meta(MODEL_TABLE)["columns"]
+        columns[name] = {"kind": "json"} if kind == "json" else {"kind": "array", "dtype": np.dtype(np.float64).str}
+        nulls = self._pending_nulls.pop(name, 0)
+        if nulls:
+            self._append_model_values(name, [None] * nulls)
+
+    def _append_model_values(self, name, values):
+        if self._table_meta(MODEL_TABLE)["columns"][name]["kind"] == "json":
+            self._append_json(name, values)
+            return
+        if name in self._json_columns:
+            raise ValueError(f"Model reporter {name} returned a non-numeric value after numeric ones")
+        array = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        with open(self._column_path(MODEL_TABLE, name, ".bin"), "ab") as fh:
+            array.tofile(fh)
+
+    def _append_json(self, name, values):
+        end = self._json_ends.get(name, 0)
+        ends = np.empty(len(values), dtype=np.int64)
+        with open(self._column_path(MODEL_TABLE, name, ".jsonl"), "ab") as fh:
+            for i, value in enumerate(values):
+                line = ((value if isinstance(value, str) else json.dumps(value)) + "\n").encode()
+                fh.write(line)
+                end += len(line)
+                ends[i] = end
+        with open(self._column_path(MODEL_TABLE, name, ".idx"), "ab") as fh:
+            ends.tofile(fh)
+        self._json_ends[name] = end
+
+    def _write_meta(self):
+        tmp = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp, "w") as fh:
+            json.dump(self.meta, fh, default=_json_default)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+    def close(self):
+        """Flush the buffer and store columns that were None in every row as NaN"""
+        self.flush()
+        if self._pending_nulls:
+            for name in list(self._pending_nulls):
+                self._add_model_column(name, "array")
+            self._write_meta()
+
+
+class JsonColumn:
+    """Lazy, read-only sequence over a JSON lines column of a stored run"""
+
+    def __init__(self, path, ends):
+        self.path = path
+        self.ends = ends
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start = int(self.ends[i - 1]) if i > 0 else 0
+        with open(self.path, "rb") as fh:
+            fh.seek(start)
+            return json.loads(fh.read(int(self.ends[i]) - start))
+
+    def __iter__(self):
+        with open(self.path, "rb") as fh:
+            for _ in range(len(self)):
+                yield json.loads(fh.readline())
+
+
+class ResultsRun:
+    """Read-only view of a run written by ResultsSink; numeric columns are memory-mapped"""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        with open(os.path.join(self.path, META_FILE)) as fh:
+            self.meta = json.load(fh)
+
+    @property
+    def params(self):
+        return self.meta["params"]
+
+    @property
+    def attrs(self):
+        return self.meta["attrs"]
+
+    @property
+    def tables(self):
+        return list(self.meta["tables"])
+
+    def columns(self, table=MODEL_TABLE):
+        return list(self.meta["tables"][table]["columns"])
+
+    def column(self, name, table=MODEL_TABLE):
+        """A memory-mapped array, or a lazy JsonColumn for non-numeric model reporters"""
+        table_meta = self.meta["tables"][table]
+        rows = table_meta["rows"]
+        column = table_meta["columns"][name]
+        base = os.path.join(self.path, table, name)
+        if column["kind"] == "json":
+            ends = np.memmap(base + ".idx", dtype=np.int64, mode="r", shape=(rows,)) if rows else np.empty(0, np.int64)
+            return JsonColumn(base + ".jsonl", ends)
+        dtype = np.dtype(column["dtype"])
+        if not rows:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(base + ".bin", dtype=dtype, mode="r", shape=(rows,))
+
+    def to_dataframe(self, table=MODEL_TABLE, columns=None):
+        """Load (a subset of) the numeric columns of a table into a DataFrame"""
+        table_meta = self.meta["tables"].get(table, {"columns": {}})
+        names = columns or [name for name, column in table_meta["columns"].items() if column["kind"] == "array"]
+        return pd.DataFrame({name: np.asarray(self.column(name, table)) for name in names})
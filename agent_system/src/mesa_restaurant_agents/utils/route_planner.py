@@ -0,0 +1,42 @@
+from itertools import permutations
+
+# Distance used for legs that cannot be walked, so such stops come last
+_UNREACHABLE = 10 ** 6
+
+
+def _leg(paths, source, target, walking):
+    moves = paths.distance(source, target) if walking else paths.between(source, target)
+    return moves if moves >= 0 else _UNREACHABLE
+
+
+def _best_order(paths, start, stops, end):
+    best, best_length = None, None
+    for order in permutations(range(len(stops))):
+        length = _leg(paths, start, stops[order[0]], True)
+        for a, b in zip(order, order[1:]):
+            length += _leg(paths, stops[a], stops[b], False)
+        if end is not None:
+            length += _leg(paths, stops[order[-1]], end, False)
+        if best_length is None or length < best_length:
+            best, best_length = order, length
+    return best
+
+
+def plan_route(paths, start, stops, end=None):
+    """
+    Order the delivery stops for the shortest walk from start, optionally ending at end.
+
+    Parameters:
+    paths (DistanceFields): Walkway distances of the grid.
+    start (tuple): Walkable cell the walk starts from (the waiter's position).
+    stops (list): Positions to visit; tables count as visited from any cell next to them.
+    end (tuple): Position to finish at, e.g. the kitchen, or None for an open route.
+
+    Returns:
+    list: Indices into stops in visiting order. The tour is solved exactly by trying every
+        order (a waiter carries at most a handful of items); the waiter keeps the result as its
+        route and only plans again when the carried customers change.
+    """
+    if len(stops) <= 1:
+        return list(range(len(stops)))
+    return list(_best_order(paths, tuple(start), [tuple(stop) for stop in stops], tuple(end) if end else None))
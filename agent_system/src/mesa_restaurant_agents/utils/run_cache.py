@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+
+from .. import __version__
+
+
+def _stable_name(obj, what):
+    """module.qualname of a function or class, which must be importable to be named stably"""
+    name = f"{obj.__module__}.{obj.__qualname__}"
+    if "<lambda>" in name or "<locals>" in name:
+        raise ValueError(f"The {what} {name} has no stable name to cache its results by; "
+                         f"define it at module level")
+    return name
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot build a cache key from a {type(value).__name__}; pass only JSON-serializable "
+                    f"parameters and model_kwargs when using a cache")
+
+
+class RunCache:
+    """
+    Content-addressed on-disk cache for reduced simulation results.
+
+    Entries are keyed by a SHA-256 hash of the run parameters, the seed, the fixed
+    model arguments, the model class, the reducer and the package version, so a cached
+    result is only reused for a run that would compute exactly the same thing. Bump the
+    package version when a model change should invalidate existing caches.
+
+    Keys are only built from values with a stable representation: parameters and model
+    arguments must be JSON-serializable and the reducer and model class must be defined
+    at module level, otherwise `key` raises instead of producing keys that never hit.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(params, seed, model_kwargs=None, reducer=None, model_cls=None, version=__version__):
+        content = json.dumps({
+            "params": params,
+            "seed": seed,
+            "model_kwargs": model_kwargs or {},
+            "model_cls": _stable_name(model_cls, "model class") if model_cls is not None else None,
+            "reducer": _stable_name(reducer, "reducer") if reducer is not None else None,
+            "version": version,
+        }, sort_keys=True, default=_json_value)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.pkl")
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key, default=None):
+        try:
+            with open(self._path(key), "rb") as fh:
+                return pickle.load(fh)
+        except FileNotFoundError:
+            return default
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(value, fh)
+        os.replace(tmp, path)
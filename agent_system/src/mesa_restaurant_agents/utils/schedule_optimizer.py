@@ -4,16 +4,17 @@ import pandas as pd
 import pyoptinterface as poi
 from pyoptinterface import highs
 from ..utils.waiter_definfitions import WaiterDefinition
+from ..utils.event_log import EventLog
 
 
 class ScheduleOptimizer:
-    def __init__(self, rf_model=None):
+    def __init__(self, rf_model=None, solver_log=False, events=None):
+        # Warnings go to the model's event log; a standalone optimizer gets its own
+        self.events = events if events is not None else EventLog()
         # Initialize the random forest model
         best_params = {'max_depth': None, 'min_samples_leaf': 1, 'min_samples_split': 2, 'n_estimators': 50}
         self.rf_model = RandomForestRegressor(random_state=42, **best_params)
-        # Initialize the optimization model
-        self.opt_model = highs.Model()
-        self.waiter_vars = {}
+        self.solver_log = solver_log  # Let HiGHS print its log to stdout
 
         # Initialize model attributes using WaiterDefinition class
         self.waiter_types = [t.value for t in WaiterDefinition.Type]
@@ -29,15 +30,12 @@ class ScheduleOptimizer:
         self.fulltime_waiters = WaiterDefinition.get_fulltime_waiters()
         self.parttime_waiters = WaiterDefinition.get_parttime_waiters()
 
-        # Initialize waiter_vars as a class variable
+        # Build the scheduling model once for all known waiters; every solve only updates it
+        self.opt_model = None
         self.waiter_vars = {}
-        for waiter_type in self.waiter_types:
-            for waiter in self.waiter_name[waiter_type]:
-                for shift in self.shifts:
-                    var_name = f"{waiter}_{shift}"
-                    self.waiter_vars[var_name] = self.opt_model.add_variable(lb=0, ub=1,
-                                                                             domain=poi.VariableDomain.Integer,
-                                                                             name=var_name)
+        self._model_key = None
+        waiters = [waiter for waiter_type in self.waiter_types for waiter in self.waiter_name[waiter_type]]
+        self._build_model(waiters, self.fulltime_waiters, self.parttime_waiters)
 
         self.training_data = pd.DataFrame()
         self._initialize_training_data()
@@ -78,7 +76,7 @@ class ScheduleOptimizer:
 
             return predicted_demand
         except Exception as e:
-            print(f"Warning: Customer prediction failed with error: {e}")
+            self.events.warning("schedule", "Customer prediction failed with error: %s", e)
             return default_prediction
 
     def update_training_data(self, df, actual_customer_counts):
@@ -113,10 +111,8 @@ class ScheduleOptimizer:
         X = df[['Shift']]
         y = df['Customers']
 
-        self.rf_model.fit(X, y)
-
         # Retrain the model with updated data
-        self._train_model()
+        self.rf_model.fit(X, y)
 
     def process_actual_data(self, actual_customer_counts):
         # Update training data with actual counts
@@ -144,8 +140,10 @@ class ScheduleOptimizer:
         model: The optimized model with the scheduling solution.
 
         Description:
-        This function creates and solves an optimization model to assign waiters to shifts while satisfying
-        several constraints. The constraints include:
+        This function solves an optimization model to assign waiters to shifts while satisfying
+        several constraints. The model is built once per set of waiters; later calls only update the
+        demands, the relaxation and the availability, and start from the previous solution.
+        The constraints include:
         1. Each full-time waiter can work at most 2 shifts per day.
         2. Each part-time waiter can work at most 1 shift per day (or 2 if constraints are relaxed).
         3. The total capacity in each shift must meet or exceed customer demands.
@@ -156,12 +154,59 @@ class ScheduleOptimizer:
 
         The objective of the model is to minimize the total number of waiters assigned to shifts.
 
-        The function returns the optimized model with the scheduling solution.
+        The function returns the optimized model with the scheduling solution; waiter_vars is filled with
+        its variables. The model is reused by the next call, so read the solution before solving again.
         """
-        model = highs.Model()  # Create a new instance of the model
+        key = (tuple(waiter_availability), tuple(fulltime_waiters), tuple(parttime_waiters))
+        if key != self._model_key:
+            self._build_model(*key)
+        model = self.opt_model
+
+        # Only the right-hand sides and the variable bounds change from one day to the next
+        self._set_parameter("parttime_max_shifts", 2 if relax_constraints else 1)  # Relax constraint if needed
+        self._set_parameter("group_relaxation", 1 if relax_constraints else 0)
+        for shift in self.shifts:
+            self._set_parameter(f"shift_{shift}_demand", predicted_demand[shift])
+
+        # Constraints 5 and 7 fix the variables of ineligible and unavailable waiters to 0
+        for waiter in fulltime_waiters + parttime_waiters:
+            for shift in self.shifts:
+                allowed = relax_constraints or (waiter in self.eligible_waiters_by_shift[shift]
+                                                and waiter_availability[waiter])
+                var_name = f"{waiter}_{shift}"
+                if self._upper_bounds.get(var_name) != allowed:
+                    model.set_variable_attribute(self.waiter_vars[var_name], poi.VariableAttribute.UpperBound,
+                                                 1 if allowed else 0)
+                    self._upper_bounds[var_name] = allowed
+
+        # Warm start from the previous day's schedule
+        if self._solution is not None:
+            variables = list(self.waiter_vars.values()) + list(self._group_vars.values())
+            model.set_primal_start(variables, self._solution)
+
+        model.optimize()
+
+        if model.get_model_attribute(poi.ModelAttribute.TerminationStatus) == poi.TerminationStatusCode.OPTIMAL:
+            self._solution = [model.get_value(var) for var in
+                              list(self.waiter_vars.values()) + list(self._group_vars.values())]
+        waiter_vars.update(self.waiter_vars)
+        return model
+
+    def _set_parameter(self, name, value):
+        """Fix a right-hand side variable of the scheduling model to value"""
+        var = self._parameters[name]
+        self.opt_model.set_variable_attribute(var, poi.VariableAttribute.LowerBound, value)
+        self.opt_model.set_variable_attribute(var, poi.VariableAttribute.UpperBound, value)
+
+    def _build_model(self, waiters, fulltime_waiters, parttime_waiters):
+        """Build the scheduling MIP for a set of waiters; solve_scheduling_problem only updates it"""
+        model = highs.Model()
+        model.set_model_attribute(poi.ModelAttribute.Silent, not self.solver_log)
+        fulltime_waiters, parttime_waiters = list(fulltime_waiters), list(parttime_waiters)
 
         # Define variables for each waiter in each shift
-        for waiter in waiter_availability:
+        waiter_vars = {}
+        for waiter in waiters:
             for shift in self.shifts:
                 var_name = f"{waiter}_{shift}"
                 waiter_vars[var_name] = model.add_variable(
@@ -176,12 +221,19 @@ class ScheduleOptimizer:
                 name=f"{waiter}_fulltime_max_two_shifts"
             )
 
+        # Right-hand sides that change between solves are variables fixed to their value (see
+        # _set_parameter): set_normalized_rhs of the HiGHS interface turns an inequality into an equality
+        self._parameters = {}
+        for name in ["parttime_max_shifts", "group_relaxation"] + [f"shift_{shift}_demand" for shift in self.shifts]:
+            self._parameters[name] = model.add_variable(lb=0, ub=0, name=name)
+
         # Constraint 2: Each part-time waiter can work at most 1 shift per day
         for waiter in parttime_waiters:
             model.add_linear_constraint(
-                poi.quicksum(waiter_vars[f"{waiter}_{shift}"] for shift in self.shifts),
+                poi.quicksum(waiter_vars[f"{waiter}_{shift}"] for shift in self.shifts)
+                - self._parameters["parttime_max_shifts"],
                 poi.Leq,
-                1 if not relax_constraints else 2,  # Relax constraint if needed
+                0,
                 name=f"{waiter}_parttime_max_one_shift"
             )
 
@@ -189,9 +241,9 @@ class ScheduleOptimizer:
         for shift in self.shifts:
             model.add_linear_constraint(
                 poi.quicksum(waiter_vars[f"{waiter}_{shift}"] * self.capacity_waiter for waiter in
-                             fulltime_waiters + parttime_waiters),
+                             fulltime_waiters + parttime_waiters) - self._parameters[f"shift_{shift}_demand"],
                 poi.Geq,
-                predicted_demand[shift],
+                0,
                 name=f"shift_{shift}_demand"
             )
 
@@ -205,41 +257,23 @@ class ScheduleOptimizer:
                 name=f"shift_{shift}_min_two_waiters"
             )
 
-        # Constraint 5: Only specific waiters can work in each shift
-        if not relax_constraints:  # Relax Constraint 2, less critical prioritization
-            for shift in self.shifts:
-                for waiter in fulltime_waiters + parttime_waiters:
-                    if waiter not in self.eligible_waiters_by_shift[shift]:
-                        model.add_linear_constraint(
-                            waiter_vars[f"{waiter}_{shift}"],
-                            poi.Eq,
-                            0,
-                            name=f"{waiter}_not_in_shift_{shift}"
-                        )
-
-        # Constraint 6: People in Group A and Group B cannot work together in the same shift
-        if not relax_constraints:  # Relax Constraint 2, less critical prioritization
-            for shift in self.shifts:
-                for waiter_A in self.group_A:
-                    for waiter_B in self.group_B:
-                        model.add_linear_constraint(
-                            waiter_vars[f"{waiter_A}_{shift}"] + waiter_vars[f"{waiter_B}_{shift}"],
-                            poi.Leq,
-                            1,
-                            name=f"group_A_B_not_together_shift_{shift}"
-                        )
-
-        # Constraint 7: Only available waiters can be assigned to shifts
-        if not relax_constraints:
-            for waiter in fulltime_waiters + parttime_waiters:
-                if not waiter_availability[waiter]:
-                    for shift in self.shifts:
-                        model.add_linear_constraint(
-                            waiter_vars[f"{waiter}_{shift}"],
-                            poi.Eq,
-                            0,
-                            name=f"{waiter}_not_available"
-                        )
+        # Constraint 6: People in Group A and Group B cannot work together in the same shift.
+        # Instead of one constraint per (A, B) pair, a binary per shift chooses the group that may
+        # work: x_A <= group_A_s and x_B <= 1 - group_A_s. Relaxing raises the right-hand sides by 1.
+        relaxation = self._parameters["group_relaxation"]
+        self._group_vars = {}
+        for shift in self.shifts:
+            group_a = model.add_variable(lb=0, ub=1, domain=poi.VariableDomain.Integer,
+                                         name=f"group_A_shift_{shift}")
+            self._group_vars[shift] = group_a
+            for waiter in self.group_A:
+                model.add_linear_constraint(waiter_vars[f"{waiter}_{shift}"] - group_a - relaxation, poi.Leq, 0,
+                                            name=f"{waiter}_group_A_shift_{shift}")
+            for waiter in self.group_B:
+                model.add_linear_constraint(waiter_vars[f"{waiter}_{shift}"] + group_a - relaxation, poi.Leq, 1,
+                                            name=f"{waiter}_group_B_shift_{shift}")
+
+        # Constraints 5 and 7 are variable bounds, set in solve_scheduling_problem
 
         # Objective: Minimize the total number of waiters assigned
         model.set_objective(
@@ -247,7 +281,8 @@ class ScheduleOptimizer:
             poi.ObjectiveSense.Minimize
         )
 
-        model.set_model_attribute(poi.ModelAttribute.Silent, False)
-        model.optimize()
-
-        return model
+        self.opt_model = model
+        self.waiter_vars = waiter_vars
+        self._model_key = (tuple(waiters), tuple(fulltime_waiters), tuple(parttime_waiters))
+        self._upper_bounds = {}
+        self._solution = None
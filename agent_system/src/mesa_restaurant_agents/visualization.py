@@ -15,6 +15,18 @@ def minutes_to_time(row):
         return f"{hours:02d}:{minutes:02d}"
 
 
+def agent_infos_from_store(agent_df):
+    """Bring a columnar AgentInfoStore DataFrame into the layout of the expanded Customer_Info/Waiter_Info dicts"""
+    df = agent_df.copy()
+    df['hours'] = ((df['time'] // 60).astype(str).str.zfill(2) + ":" +
+                   (df['time'] % 60).astype(str).str.zfill(2))
+    df['day'] = df['day'].astype(str)
+    df['time'] = df['day'] + " " + df['hours']
+    # Like the dict reporters keyed by time of day, keep only the last snapshot per time
+    df = df[df['step'] == df.groupby('time')['step'].transform('max')]
+    return df.drop(columns='step').reset_index(drop=True)
+
+
 def display_mean_step_results(results):
     df = pd.DataFrame(results)
     df = df[df["RunId"] == 0]
@@ -110,14 +122,18 @@ def display_mean_step_results(results):
     return data_grouped
 
 def display_first_run_step_results_customer(results):
-    df = pd.DataFrame(results)
-    data_first_run = df[df["RunId"] == 0]
-    data_first_run['hours'] = data_first_run.apply(minutes_to_time, axis=1)
-    data_first_run['day_hour'] = data_first_run['day'].astype(str) + " " + data_first_run['hours']
+    """Plot customer metrics from batch_run results or from model.agent_info.customer_dataframe()"""
+    if isinstance(results, pd.DataFrame):
+        customer_infos_df = agent_infos_from_store(results)
+    else:
+        df = pd.DataFrame(results)
+        data_first_run = df[df["RunId"] == 0]
+        data_first_run['hours'] = data_first_run.apply(minutes_to_time, axis=1)
+        data_first_run['day_hour'] = data_first_run['day'].astype(str) + " " + data_first_run['hours']
 
-    customer_infos_dict = dict(zip(data_first_run["day_hour"], data_first_run["Customer_Info"]))
-    customer_infos_list = [{**item, 'time': k} for k, v in customer_infos_dict.items() for item in v]
-    customer_infos_df = pd.DataFrame(customer_infos_list)
+        customer_infos_dict = dict(zip(data_first_run["day_hour"], data_first_run["Customer_Info"]))
+        customer_infos_list = [{**item, 'time': k} for k, v in customer_infos_dict.items() for item in v]
+        customer_infos_df = pd.DataFrame(customer_infos_list)
 
     plots = ['waiting_time', 'satisfaction']
 
@@ -131,15 +147,19 @@ def display_first_run_step_results_customer(results):
 
 
 def display_first_run_step_results_waiter(results):
-    df = pd.DataFrame(results)
-    data_first_run = df[df["RunId"] == 0]
-    data_first_run['hours'] = data_first_run.apply(minutes_to_time, axis=1)
-    data_first_run['day_hour'] = data_first_run['day'].astype(str) + " " + data_first_run['hours']
+    """Plot waiter metrics from batch_run results or from model.agent_info.waiter_dataframe()"""
+    if isinstance(results, pd.DataFrame):
+        waiter_infos_df = agent_infos_from_store(results)
+    else:
+        df = pd.DataFrame(results)
+        data_first_run = df[df["RunId"] == 0]
+        data_first_run['hours'] = data_first_run.apply(minutes_to_time, axis=1)
+        data_first_run['day_hour'] = data_first_run['day'].astype(str) + " " + data_first_run['hours']
 
-    waiter_infos_dict = dict(zip(data_first_run['day_hour'], data_first_run['Waiter_Info']))
+        waiter_infos_dict = dict(zip(data_first_run['day_hour'], data_first_run['Waiter_Info']))
 
-    waiter_infos_list = [{**item, 'time': k, 'day': k.split()[0], 'hours': k.split()[1]} for k, v in waiter_infos_dict.items() for item in v]
-    waiter_infos_df = pd.DataFrame(waiter_infos_list)
+        waiter_infos_list = [{**item, 'time': k, 'day': k.split()[0], 'hours': k.split()[1]} for k, v in waiter_infos_dict.items() for item in v]
+        waiter_infos_df = pd.DataFrame(waiter_infos_list)
 
     waiter_infos_df['hours'] = pd.to_datetime(waiter_infos_df['hours'], format='%H:%M').dt.time
 
@@ -184,16 +204,28 @@ def display_first_run_step_results_waiter(results):
 
 
 class GridAnimator:
-    def __init__(self, results):
+    def __init__(self, results, trajectory=None):
         df = pd.DataFrame(results)
         data_first_run = df[df["RunId"] == 0]
         self.step_data = data_first_run.to_dict('records')
+        # Delta-encoded grid states (GridTrajectory) replace the GridState column if given
+        self.trajectory = trajectory
         self.grid_height = results[0]['grid_height'] if results[0]['grid_height'] % 2 != 0 else results[0]['grid_height'] + 1  # make sure grid_height is uneven
         self.grid_width = results[0]['grid_width'] if results[0]['grid_width'] % 2 != 0 else results[0]['grid_width'] + 1  # make sure grid_width is uneven
         self.count = 0
         self.fig, self.ax = plt.subplots(figsize=(10, 10))
         self.init_ani()
 
+    @classmethod
+    def from_model(cls, model):
+        """Animate a model run with grid_state_backend="trajectory" directly from the model"""
+        results = model.datacollector.get_model_vars_dataframe()
+        results["Step"] = model.grid_trajectory.collected_steps()
+        results["RunId"] = 0
+        results["grid_width"] = model.grid_width
+        results["grid_height"] = model.grid_height
+        return cls(results.to_dict('records'), trajectory=model.grid_trajectory)
+
     def _create_grid_frame(self, step_data):
         """Convert lightweight grid state to visualization format"""
         # Initialize grid with FREE value
@@ -201,8 +233,13 @@ class GridAnimator:
         agent_counts = np.zeros((self.grid_width, self.grid_height))
         waiter_nrs = np.zeros((self.grid_width, self.grid_height))
 
+        if self.trajectory is not None:
+            grid_state = self.trajectory.state_at(step_data['Step'])
+        else:
+            grid_state = step_data['GridState']
+
         # Handle GridState first (agents and static objects)
-        for cell in reversed(step_data['GridState']):
+        for cell in reversed(grid_state):
             x, y = cell['pos']
             # Skip if coordinates are out of bounds
             if x >= self.grid_width or y >= self.grid_height:
@@ -215,7 +252,7 @@ class GridAnimator:
                 grid[x][y] = EnvironmentDefinition.KITCHEN.value
 
         # Then add agents in a second pass to ensure they're not overwritten
-        for cell in step_data['GridState']:
+        for cell in grid_state:
             x, y = cell['pos']
             # Skip if coordinates are out of bounds
             if x >= self.grid_width or y >= self.grid_height:
@@ -0,0 +1,29 @@
+from mesa_restaurant_agents.model.restaurant_model import RestaurantModel
+
+
+def test_columnar_snapshots_match_dict_reporters():
+    kwargs = dict(n_waiters=3, grid_width=15, grid_height=15, seed=4)
+    dicts = RestaurantModel(**kwargs)
+    columnar = RestaurantModel(**kwargs, agent_info_backend="columnar")
+    for _ in range(60):
+        dicts.step()
+        columnar.step()
+
+    expected = [(step, info["customer_nr"], info["waiting_time"], info["satisfaction"])
+                for step, infos in enumerate(dicts.datacollector.model_vars["Customer_Info"])
+                for info in infos]
+    customers = columnar.agent_info.customer_dataframe()
+    actual = list(zip(customers["step"].tolist(), customers["customer_nr"].tolist(),
+                      customers["waiting_time"].tolist(), customers["satisfaction"].tolist()))
+    assert actual == expected
+
+
+def test_satisfaction_keeps_full_precision():
+    model = RestaurantModel(n_waiters=3, grid_width=15, grid_height=15, seed=4, agent_info_backend="columnar")
+    while not model.customers:
+        model.step()
+    customer = next(iter(model.customers))
+    customer.satisfaction = 100 / 3
+    model.agent_info.collect(model)
+    customers = model.agent_info.customer_dataframe()
+    assert customers[customers["customer_nr"] == customer.unique_id]["satisfaction"].tolist()[-1] == 100 / 3
@@ -0,0 +1,26 @@
+from mesa_restaurant_agents.model.restaurant_model import RestaurantModel
+from mesa_restaurant_agents.utils.arrival_schedule import ArrivalSchedule
+
+
+def test_stepped_model_seats_every_drawn_arrival():
+    model = RestaurantModel(n_waiters=3, grid_width=15, grid_height=15, seed=2)
+    schedule = ArrivalSchedule.from_rate(model.arrival_rate, model.opening_hour, model.closing_hour,
+                                         model.time_step)
+    model = RestaurantModel(n_waiters=3, grid_width=15, grid_height=15, seed=2, arrivals=schedule)
+    seated = []
+    add_customer = model.add_customer
+
+    def record_seating(*args, **kwargs):
+        seated.append(model.current_minute)
+        return add_customer(*args, **kwargs)
+    model.add_customer = record_seating
+
+    for _ in range(2):
+        arrivals, seated[:] = model.day_arrivals, []
+        for _ in range(model.steps_per_day):
+            model.step()
+        assert len(seated) == len(arrivals)
+        # Every customer is seated on the first step at or after their drawn minute, or on the last one
+        last = model.closing_hour - model.time_step
+        assert all(minute <= seat < minute + model.time_step or seat == last
+                   for minute, seat in zip(arrivals.minutes.tolist(), seated))
@@ -0,0 +1,41 @@
+from mesa_restaurant_agents.agents.waiter_agent import WaiterAgent
+from mesa_restaurant_agents.model.restaurant_model import RestaurantModel
+from mesa_restaurant_agents.utils.cadenced_datacollector import CadencedDataCollector
+
+
+def test_agent_reporters_and_tables_are_kept():
+    model = RestaurantModel(n_waiters=2, grid_width=15, grid_height=15, seed=3)
+    collector = CadencedDataCollector(model_reporters={"time": lambda m: m.current_minute},
+                                      periods={"time": 2},
+                                      agent_reporters={"tips": "tips"},
+                                      agenttype_reporters={WaiterAgent: {"served": "served_customers"}},
+                                      tables={"Events": ["step"]})
+    for _ in range(4):
+        model.step()
+        collector.collect(model)
+        collector.add_table_row("Events", {"step": model.steps})
+
+    model_vars = collector.get_model_vars_dataframe()
+    assert model_vars["time"].isna().tolist() == [True, False, True, False]
+    assert sorted(collector.get_agent_vars_dataframe().index.get_level_values("Step").unique()) == [1, 2, 3, 4]
+    assert len(collector.get_agenttype_vars_dataframe(WaiterAgent)) > 0
+    assert collector.get_table_dataframe("Events")["step"].tolist() == [1, 2, 3, 4]
+
+
+def test_model_reporter_kinds_match_mesa():
+    model = RestaurantModel(n_waiters=2, grid_width=15, grid_height=15, seed=3)
+    collector = CadencedDataCollector(model_reporters={
+        "lambda": lambda m: m.current_minute,
+        "attribute": "current_minute",
+        "function_with_args": [divmod, [7, 2]],
+        "method": model.get_waiters_count,
+    }, periods={"attribute": 2})
+    for _ in range(2):
+        model.step()
+        collector.collect(model)
+
+    model_vars = collector.model_vars
+    assert model_vars["attribute"] == [None, model.current_minute]
+    assert model_vars["lambda"][1] == model.current_minute
+    assert model_vars["function_with_args"] == [(3, 1), (3, 1)]
+    assert model_vars["method"] == [2, 2]
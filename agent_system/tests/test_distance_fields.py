@@ -0,0 +1,24 @@
+import numpy as np
+
+from mesa_restaurant_agents.utils import distance_fields
+from mesa_restaurant_agents.utils.distance_fields import DistanceFields
+
+
+def test_fields_stay_within_max_bytes():
+    walkable = np.ones((20, 20), dtype=bool)
+    fields = DistanceFields(20, 20, walkable, kitchen_pos=(0, 0), max_bytes=10 * 8 * 20 * 20)
+    for x in range(20):
+        for y in range(20):
+            fields.field((x, y))
+            assert fields.nbytes() <= 10 * 8 * 20 * 20
+    assert fields.distance((0, 0), (19, 19)) == 1  # torus
+
+
+def test_layout_cache_is_bounded_and_can_be_cleared():
+    DistanceFields.clear_layout_cache()
+    for size in range(5, 5 + 2 * distance_fields._MAX_LAYOUTS):
+        first = DistanceFields.for_layout(size, size, (0, 0), np.ones((size, size), dtype=bool))
+        assert DistanceFields.for_layout(size, size, (0, 0), np.ones((size, size), dtype=bool)) is first
+    assert len(distance_fields._LAYOUT_CACHE) == distance_fields._MAX_LAYOUTS
+    DistanceFields.clear_layout_cache()
+    assert not distance_fields._LAYOUT_CACHE
@@ -0,0 +1,22 @@
+from mesa_restaurant_agents.utils.kitchen import PreparedOrders
+
+
+def test_removed_orders_do_not_pile_up_in_the_queue():
+    orders = PreparedOrders()
+    for customer in range(100):
+        orders.add(customer, "pizza", customer)
+        if customer % 10:
+            assert orders.remove(customer) == "pizza"
+        assert len(orders._queue) <= 2 * len(orders) + 1
+    assert len(orders) == 10
+    assert orders.take(3) == [(0, "pizza"), (10, "pizza"), (20, "pizza")]
+
+
+def test_replaced_orders_are_taken_once():
+    orders = PreparedOrders()
+    orders.add("a", "pasta", 5)
+    orders.add("b", "pizza", 3)
+    orders["a"] = "steak"
+    del orders["b"]
+    assert orders.take(5) == [("a", "steak")]
+    assert not orders._queue and orders._stale == 0
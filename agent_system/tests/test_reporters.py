@@ -0,0 +1,38 @@
+import pytest
+
+from mesa_restaurant_agents.agents.customer_agent import CustomerAgent
+from mesa_restaurant_agents.model.restaurant_model import RestaurantModel
+
+
+def full_scan(model):
+    """The reporters computed by scanning every agent, as before the running totals"""
+    customers = [agent for agent in model.agents if isinstance(agent, CustomerAgent)]
+    n = len(customers)
+    return {
+        "customers": n,
+        "wait": sum(customer.waiting_time for customer in customers) / n if n else 0.0,
+        "satisfaction": sum(customer.satisfaction for customer in customers) / n if n else 100.0,
+        "tips": round(sum(waiter.tips for waiter in model.waiters), 2),
+    }
+
+
+def reporters(model):
+    return {
+        "customers": model.get_customers_count(),
+        "wait": model.get_average_wait_time(),
+        "satisfaction": model.get_average_satisfaction(),
+        "tips": model.get_total_tips(),
+    }
+
+
+@pytest.mark.parametrize("customer_backend", ["agents", "arrays"])
+def test_running_totals_match_full_scan(customer_backend):
+    model = RestaurantModel(n_waiters=5, grid_width=15, grid_height=15, seed=11,
+                            customer_backend=customer_backend)
+    tipped = False
+    for _ in range(3 * model.steps_per_day):
+        model.step()
+        assert reporters(model) == full_scan(model)
+        tipped = tipped or model.get_total_tips() != 0
+    assert model.current_day == 4
+    assert tipped
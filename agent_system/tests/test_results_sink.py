@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from mesa_restaurant_agents.model.restaurant_model import RestaurantModel
+from mesa_restaurant_agents.utils.grid_trajectory import GridTrajectory
+from mesa_restaurant_agents.utils.results_sink import ResultsRun, ResultsSink
+
+
+def test_refuses_non_empty_run_directory(tmp_path):
+    sink = ResultsSink(tmp_path / "run", chunk_rows=2)
+    sink.append_row({"x": 1})
+    sink.close()
+    with pytest.raises(FileExistsError):
+        ResultsSink(tmp_path / "run")
+
+    sink = ResultsSink(tmp_path / "run", overwrite=True)
+    sink.append_row({"x": 2})
+    sink.close()
+    assert ResultsRun(tmp_path / "run").column("x").tolist() == [2.0]
+
+
+def test_column_kind_follows_first_value_that_is_not_none(tmp_path):
+    sink = ResultsSink(tmp_path / "run", chunk_rows=2)
+    rows = [{"stats": None, "count": None, "empty": None}] * 3 + [{"stats": [1, 2], "count": 4, "empty": None}]
+    for row in rows:
+        sink.append_row(row)
+    sink.close()
+
+    run = ResultsRun(tmp_path / "run")
+    assert list(run.column("stats")) == [None, None, None, [1, 2]]
+    assert np.isnan(run.column("count")[:3]).all() and run.column("count")[3] == 4
+    assert np.isnan(run.column("empty")).all() and len(run.column("empty")) == 4
+
+
+def test_trajectory_streams_to_sink_and_keeps_state_at(tmp_path):
+    kwargs = dict(n_waiters=3, grid_width=15, grid_height=15, seed=5, grid_state_backend="trajectory")
+    model = RestaurantModel(**kwargs, results_sink=ResultsSink(tmp_path / "run", chunk_rows=64))
+    in_memory = RestaurantModel(**kwargs)
+    for _ in range(model.steps_per_day // 2):
+        model.step()
+        in_memory.step()
+        # Mid-run queries see the part already written to the sink and the part still in memory
+        for step in (0, model.steps // 2, model.steps):
+            assert model.grid_trajectory.state_at(step) == in_memory.grid_trajectory.state_at(step)
+    assert model.grid_trajectory._flushed["events"] > 0
+
+    model.close_results()
+    loaded = GridTrajectory.load(ResultsRun(tmp_path / "run"))
+    assert loaded.collected_steps().tolist() == in_memory.grid_trajectory.collected_steps().tolist()
+    for step in range(model.steps + 1):
+        assert loaded.state_at(step) == in_memory.grid_trajectory.state_at(step)
+        assert model.grid_trajectory.state_at(step) == in_memory.grid_trajectory.state_at(step)
@@ -0,0 +1,42 @@
+import pytest
+
+from mesa_restaurant_agents.model.restaurant_model import RestaurantModel
+from mesa_restaurant_agents.sweep import run_sweep
+from mesa_restaurant_agents.utils.run_cache import RunCache
+
+RUNS = []
+
+
+def count_runs(model):
+    """Reducer that records every run it reduces and returns None"""
+    RUNS.append(model.steps)
+    return None
+
+
+def test_cached_none_results_are_not_rerun(tmp_path):
+    kwargs = dict(reducer=count_runs, processes=1, display_progress=False, cache_dir=tmp_path)
+    parameters = {"n_waiters": [1, 2], "grid_width": 9, "grid_height": 9, "max_steps": 3}
+    first = run_sweep(parameters, **kwargs)
+    second = run_sweep(parameters, **kwargs)
+    assert len(RUNS) == 2
+    assert [run["result"] for run in second] == [None, None]
+    assert [run["seed"] for run in second] == [run["seed"] for run in first]
+
+
+class OtherModel(RestaurantModel):
+    """Subclass whose cached results must not be mixed up with RestaurantModel's"""
+
+
+def test_cache_key_covers_the_model_class():
+    params = {"n_waiters": 1}
+    assert RunCache.key(params, 1, reducer=count_runs, model_cls=RestaurantModel) != \
+        RunCache.key(params, 1, reducer=count_runs, model_cls=OtherModel)
+    assert RunCache.key(params, 1, reducer=count_runs, model_cls=OtherModel) == \
+        RunCache.key(params, 1, reducer=count_runs, model_cls=OtherModel)
+
+
+def test_cache_key_rejects_unstable_values():
+    with pytest.raises(ValueError):
+        RunCache.key({}, 1, reducer=lambda model: None)
+    with pytest.raises(TypeError):
+        RunCache.key({}, 1, model_kwargs={"arrivals": object()}, reducer=count_runs)